@@ -72,6 +72,10 @@ class Worker(object):
                 'geo-mapping-create', mapping_exchange,
                 routing_key='geo.mapping.create'
             ),
+            Queue(
+                'geo-mapping-create-large', mapping_exchange,
+                routing_key='geo.mapping.create.large'
+            ),
             Queue(
                 'geo-mapping-extend', mapping_exchange,
                 routing_key='geo.mapping.extend'
@@ -87,7 +91,8 @@ class Worker(object):
         celery_app.conf.task_default_exchange_type = 'direct'
         celery_app.conf.task_default_routing_key = 'geo.default'
 
-        # Configure tasks of Celery - RabbitMQ
+        # Configure tasks of Celery - RabbitMQ, large uploads
+        # are sent by the worker to geo-mapping-create-large
         celery_app.conf.task_routes = {
             'gis_worker_tasks.create_mapping': {
                 'queue': 'geo-mapping-create',
@@ -138,7 +143,8 @@ def main_script():
             transformations from asynchronous way with Celery and \
             messaging protocol as AMQP (RabbitMQ) plus Redis DB \
             to save the generated information or from CLI.',
-        usage='gis_worker.py [-h] [ -t | -i | -f | -gj | -gt path ]'
+        usage='gis_worker.py [-h] [ -t | -i | -f | -gj | -gt path ] [-p] '
+              '[-m]'
     )
     parser.add_argument(
         '-t', '--transform', nargs=1, default=None, metavar='path',
@@ -163,6 +169,17 @@ def main_script():
         '-gt', '--geo-transform', nargs=1, default=None, metavar='path',
         help='execute a GeoKettle transformation.'
     )
+    parser.add_argument(
+        '-p', '--profile', action='store_true',
+        help='print wall time and memory of each stage\n'
+             'of the transformation.'
+    )
+    parser.add_argument(
+        '-m', '--migrate', action='store_true',
+        help='migrate the layers and fields of the tasks saved\n'
+             'at Redis with the previous keys to one document\n'
+             'per task.'
+    )
 
     # Check there at least one parameter
     if len(sys.argv) == 1:
@@ -181,9 +198,27 @@ def main_script():
     # Option: convert + id
     if __args.transform is not None:
 
-        sys.exit(gis_worker_tasks.transform_with_path(
-            __args.transform[0], '.shp', __logger
-        )['status'])
+        # Create profiler if stages must be measured
+        __profiler = None
+        if __args.profile:
+            from gis_worker_src.profiler import WorkerProfiler
+            __profiler = WorkerProfiler()
+
+        __status = gis_worker_tasks.transform_with_path(
+            __args.transform[0], '.shp', __logger, __profiler
+        )['status']
+
+        # Print measures of the stages
+        if __profiler is not None:
+            settings.dump_messages(__logger, {
+                'info': [
+                    '* ------------ Profile ------------\n'
+                ] + __profiler.messages(),
+                'warn': [],
+                'error': []
+            })
+
+        sys.exit(__status)
 
     # Option: info + id
     elif __args.info is not None:
@@ -213,6 +248,11 @@ def main_script():
             __args.geo_transform[0], __logger, True
         )['status'])
 
+    # Option: migrate
+    elif __args.migrate:
+
+        sys.exit(gis_worker_tasks.migrate_metadata(__logger)['status'])
+
     else:
         sys.exit(1)
 
@@ -0,0 +1,528 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+from datetime import datetime
+from multiprocessing import Process, Queue
+from multiprocessing.queues import Empty
+from gis_worker_src import settings
+from gis_worker_src.profiler import WorkerProfiler
+
+if sys.version_info < (3, 0):
+    reload(sys)
+    sys.setdefaultencoding('utf8')
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+config = settings.Config()
+
+# Folder with the examples of the worker
+benchmark_examples = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'gis_worker_examples'
+)
+
+
+##########################################################################
+
+
+def get_source_paths(folder):
+    """ This function returns the geo-spatial files
+        of a folder that would be sent to the worker.
+
+    Args:
+        folder (string): folder's path
+
+    Returns:
+        list: files' paths
+
+    """
+
+    __paths = []
+
+    # Iterate over files with a known driver, hidden
+    # files (e.g. __MACOSX/._name.shp) are skipped
+    for __root, __dirs, __files in os.walk(folder):
+        __dirs[:] = [__d for __d in __dirs if not __d.startswith('__')]
+        for __f in sorted(__files):
+            if not __f.startswith('.') and \
+               os.path.splitext(__f)[1] in config.upload_drivers:
+                __paths.append(os.path.join(__root, __f))
+
+    return sorted(__paths)
+
+
+def prepare_source(path, folder):
+    """ This function copies a geo-spatial file and its
+        linked files (same name) to its own folder, so
+        the outputs of each file are not mixed.
+
+    Args:
+        path (string): file's path
+        folder (string): destination folder's path
+
+    Returns:
+        string: copied file's path
+
+    """
+
+    # Create folder of the file
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+
+    # Copy files with the same name
+    __name = os.path.splitext(os.path.basename(path))[0]
+    __folder = os.path.dirname(path)
+    for __f in os.listdir(__folder):
+        if __f.split('.')[0] == __name and \
+           os.path.isfile(os.path.join(__folder, __f)):
+            shutil.copy(os.path.join(__folder, __f), folder)
+
+    return os.path.join(folder, os.path.basename(path))
+
+
+def prepare_example(path, folder):
+    """ This function copies or extracts an example
+        to its own folder.
+
+    Args:
+        path (string): example's path
+        folder (string): destination folder's path
+
+    Returns:
+        list: geo-spatial files' paths
+
+    """
+
+    # Create folder of the example
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+
+    # Extract compressed example or copy it
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as __zip:
+            __zip.extractall(folder)
+    else:
+        shutil.copy(path, folder)
+
+    return get_source_paths(folder)
+
+
+def scale_example(path, folder, factor):
+    """ This function generates a copy of a geo-spatial
+        file with its features repeated factor times
+        with the same driver.
+
+    Args:
+        path (string): file's path
+        folder (string): destination folder's path
+        factor (int): times each feature is written
+
+    Returns:
+        string: scaled file's path
+
+    """
+
+    # Open source file, it is opened as DataSource Read-Only (0)
+    from osgeo import ogr
+    __src = ogr.Open(path, 0)
+    __driver = __src.GetDriver()
+
+    # Create destination file
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    __dst_path = os.path.join(folder, os.path.basename(path))
+    __dst = __driver.CreateDataSource(__dst_path)
+
+    # Iterate over layers of the file
+    for __index in range(0, __src.GetLayerCount()):
+        __src_layer = __src.GetLayer(__index)
+        __src_layer_def = __src_layer.GetLayerDefn()
+
+        # Create layer with same schema
+        __dst_layer = __dst.CreateLayer(
+            __src_layer.GetName(), __src_layer.GetSpatialRef(),
+            __src_layer.GetGeomType()
+        )
+        for __field in range(0, __src_layer_def.GetFieldCount()):
+            __dst_layer.CreateField(
+                __src_layer_def.GetFieldDefn(__field)
+            )
+        __dst_layer_def = __dst_layer.GetLayerDefn()
+
+        # Write features factor times
+        for __n in range(0, factor):
+            __src_layer.ResetReading()
+            __src_feat = __src_layer.GetNextFeature()
+            while __src_feat is not None:
+                __dst_feat = ogr.Feature(__dst_layer_def)
+                __dst_feat.SetFrom(__src_feat)
+                __dst_layer.CreateFeature(__dst_feat)
+                __src_feat = __src_layer.GetNextFeature()
+
+    # Close files
+    __dst = None
+    __src = None
+
+    return __dst_path
+
+
+def count_features(path):
+    """ This function returns the number of features
+        of all the layers of a geo-spatial file.
+
+    Args:
+        path (string): file's path
+
+    Returns:
+        int: number of features
+
+    """
+
+    from osgeo import ogr
+    __src = ogr.Open(path, 0)
+    if __src is None:
+        return 0
+
+    return sum(
+        __src.GetLayer(__index).GetFeatureCount()
+        for __index in range(0, __src.GetLayerCount())
+    )
+
+
+##########################################################################
+
+
+def run_stage(queue, stage, path):
+    """ This function executes a stage of the worker
+        at a child process and sends its status, wall time
+        and peak of resident memory (KB) measured by the
+        profiler of the worker, with the measures of the
+        inner stages of the transformation (convert, layers,
+        export and the stages of each layer).
+
+    Args:
+        queue (Queue): queue to send the result
+        stage (string): transform, info or fields
+        path (string): file's path
+
+    """
+
+    # Import methods of the worker
+    import gis_worker_tasks
+
+    __profiler = WorkerProfiler()
+    with __profiler.stage(stage):
+        try:
+
+            # Execute stage without logging messages
+            if stage == 'transform':
+                __status = gis_worker_tasks.transform_with_path(
+                    path, '.shp', None, __profiler
+                )['status']
+            elif stage == 'info':
+                __status = gis_worker_tasks.info_with_path(
+                    path, None, True
+                )['status']
+            else:
+                __status = max([0] + [
+                    gis_worker_tasks.fields_with_path(
+                        __path, None, True
+                    )['status'] for __path in path
+                ])
+
+        except Exception:
+            __status = 3
+
+    # Stage of the execution is the last finished one
+    queue.put({
+        'status': __status,
+        'wall': __profiler.stages[-1]['wall'],
+        'rss_peak': __profiler.stages[-1]['rss_peak'],
+        'stages': __profiler.stages[:-1]
+    })
+
+
+def measure_stage(stage, path, timeout=0):
+    """ This function measures a stage of the worker
+        at a new process, so peaks of memory are not
+        shared between stages. The measure is failed
+        (status 3) if the process exits without sending
+        it or the timeout is reached.
+
+    Args:
+        stage (string): transform, info or fields
+        path (string): file's path
+        timeout (int): seconds before the process is stopped
+
+    Returns:
+        dict: status, wall time and peak of memory
+
+    """
+
+    __queue = Queue()
+    __process = Process(target=run_stage, args=(__queue, stage, path))
+    __start = time.time()
+    __process.start()
+
+    # Wait for the result while the process is running
+    __result = None
+    __reason = None
+    while __result is None:
+        try:
+            __result = __queue.get(timeout=1)
+        except Empty:
+
+            # Check if process exited, the result could be
+            # sent just before exiting
+            if not __process.is_alive():
+                try:
+                    __result = __queue.get(timeout=1)
+                except Empty:
+                    __reason = 'process exited with code ' + \
+                        str(__process.exitcode)
+                break
+
+            # Check if timeout is reached
+            if timeout and time.time() - __start > timeout:
+                __process.terminate()
+                __reason = 'process stopped after ' + \
+                    str(timeout) + ' seconds'
+                break
+
+    __process.join()
+
+    # Save failed measure
+    if __result is None:
+        __result = {
+            'status': 3,
+            'wall': round(time.time() - __start, 4),
+            'rss_peak': None,
+            'error': __reason
+        }
+
+    return __result
+
+
+def benchmark_example(path, folder, scales, timeout=0):
+    """ This function measures the stages of the worker
+        over an example and its scaled versions.
+
+    Args:
+        path (string): example's path
+        folder (string): working folder's path
+        scales (list): factors of the scaled versions
+        timeout (int): seconds before a stage is stopped
+
+    Returns:
+        list: measures of the stages
+
+    """
+
+    # Prepare original example
+    __name = os.path.splitext(os.path.basename(path))[0]
+    __sources = prepare_example(path, os.path.join(folder, __name))
+
+    __results = []
+    for __source in __sources:
+
+        # Copy each file of the example to its own folder
+        __source_name = os.path.splitext(os.path.basename(__source))[0]
+        __source_key = __name if len(__sources) == 1 else \
+            __name + '-' + __source_name
+        if len(__sources) > 1:
+            __source = prepare_source(
+                __source, os.path.join(folder, __source_key)
+            )
+
+        for __scale in scales:
+
+            # Generate scaled version of the file
+            __path = __source if __scale == 1 else scale_example(
+                __source, os.path.join(
+                    folder, __source_key + '-x' + str(__scale)
+                ), __scale
+            )
+            __features = count_features(__path)
+
+            # Measure information and transformation
+            __measures = [
+                ('info', measure_stage('info', __path, timeout)),
+                ('transform', measure_stage('transform', __path, timeout))
+            ]
+
+            # Measure fields of the generated layers
+            __path_shp = os.path.join(os.path.dirname(__path), 'shp')
+            __measures.append(('fields', measure_stage('fields', [
+                os.path.join(__path_shp, __f)
+                for __f in sorted(os.listdir(__path_shp))
+                if __f.endswith('.shp')
+            ] if os.path.isdir(__path_shp) else [], timeout)))
+
+            # Save measures with features per second
+            for __stage, __measure in __measures:
+                __measure.update({
+                    'example': __name,
+                    'source': os.path.basename(__source),
+                    'scale': __scale,
+                    'stage': __stage,
+                    'features': __features,
+                    'features_s': round(
+                        __features / __measure['wall'], 2
+                    ) if __measure['wall'] > 0 else 0
+                })
+                __results.append(__measure)
+
+    return __results
+
+
+def check_field_profile(values=200000, cap=1000):
+    """ This function profiles a field with more distinct
+        values than the cap, so its cardinality is estimated,
+        and checks the error of the estimation.
+
+    Args:
+        values (int): distinct values of the field
+        cap (int): distinct values saved before estimating
+
+    Returns:
+        dict: status, cardinality and error of the check
+
+    """
+
+    from gis_worker_src.fields import FieldProfile
+
+    # Profile distinct values and some duplicated ones
+    __profile = FieldProfile(cap)
+    for __value in range(0, values):
+        __profile.add(__value)
+    for __value in range(0, values / 10):
+        __profile.add(__value)
+    __info = __profile.information()
+
+    # Check error against the standard error of the sketch
+    __error = abs(__info['cardinality'] - values) / float(values)
+    return {
+        'check': 'field_profile',
+        'values': values,
+        'cap': cap,
+        'cardinality': __info['cardinality'],
+        'error': round(__error, 4),
+        'status': 0 if __info['estimated'] and not __info['unique'] and
+        __error <= 3 * __profile.sketch.error else 2
+    }
+
+
+##########################################################################
+
+
+def main_script():
+    """ This function allows you to run the benchmark from command
+        line. It accepts arguments and options as you can see below these
+        comments.
+
+    """
+
+    # Create configuration for command line
+    parser = argparse.ArgumentParser(
+        description='This software measures the wall time, the peak of \
+            memory and the features per second of the transformation, \
+            information and fields of the GIS Worker over the examples \
+            and their scaled versions.',
+        usage='gis_worker_benchmark.py [-h] [-e path] [-s n [n ...]] '
+              '[-t seconds] [-w path] [-o path]'
+    )
+    parser.add_argument(
+        '-e', '--examples', default=benchmark_examples, metavar='path',
+        help='folder with the examples (zip, kml, geojson).'
+    )
+    parser.add_argument(
+        '-s', '--scales', nargs='+', type=int, default=[1, 10, 100, 1000],
+        metavar='n', help='times the features of each example are\n'
+                          'repeated (1 = original example).'
+    )
+    parser.add_argument(
+        '-t', '--timeout', type=int, default=3600, metavar='seconds',
+        help='seconds before a stage is stopped and its measure\n'
+             'is failed (0 = no limit).'
+    )
+    parser.add_argument(
+        '-w', '--work', default=None, metavar='path',
+        help='working folder (default temporal folder that is\n'
+             'removed at the end).'
+    )
+    parser.add_argument(
+        '-o', '--output', default=None, metavar='path',
+        help='file to save the results as JSON (default stdout).'
+    )
+
+    # Get parameters from CLI
+    __args = parser.parse_args()
+
+    # Create working folder
+    __work = __args.work or tempfile.mkdtemp(prefix='gis-benchmark-')
+
+    try:
+
+        # Measure every example
+        __results = []
+        for __f in sorted(os.listdir(__args.examples)):
+            __results += benchmark_example(
+                os.path.join(__args.examples, __f), __work,
+                __args.scales, __args.timeout
+            )
+
+    finally:
+
+        # Remove temporal folder
+        if __args.work is None:
+            shutil.rmtree(__work, ignore_errors=True)
+
+    # Generate report
+    __report = json.dumps({
+        'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'engine': config.gis_engine,
+        'workers': config.gis_workers,
+        'export': config.gis_export,
+        'checks': [check_field_profile()],
+        'results': __results
+    }, indent=2, sort_keys=True)
+
+    # Save or print report
+    if __args.output is not None:
+        with open(__args.output, 'w') as __output:
+            __output.write(__report + '\n')
+    else:
+        print(__report)
+
+
+if __name__ == "__main__":
+
+    main_script()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import os
+import sys
+import math
+import random
+import argparse
+
+if sys.version_info < (3, 0):
+    reload(sys)
+    sys.setdefaultencoding('utf8')
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+# Drivers and layer options of the generated formats
+generator_drivers = {
+    '.shp': 'ESRI Shapefile',
+    '.kml': 'KML',
+    '.geojson': 'GeoJSON',
+    '.csv': 'CSV'
+}
+generator_options = {
+    '.shp': [],
+    '.kml': [],
+    '.geojson': [],
+    '.csv': ['GEOMETRY=AS_WKT']
+}
+
+# Kinds of generated geometries
+generator_geometries = ['point', 'line', 'polygon', 'multipolygon']
+
+# Kinds of generated fields, mistyped fields save numbers
+# and dates as strings, latin1 fields save accented words
+# (ISO-8859-1 at Shapefiles) and empty fields are almost null
+generator_fields = [
+    'int', 'float', 'date', 'string', 'mistyped', 'latin1', 'empty'
+]
+
+# Words to generate string values
+generator_words = [
+    'norte', 'sur', 'este', 'oeste', 'río', 'montaña', 'camino',
+    'año', 'pequeño', 'señal', 'ávila', 'cáceres', 'león', 'jaén'
+]
+
+
+##########################################################################
+
+
+def get_ogr_fields(fields):
+    """ This function returns the name and kind of the
+        OGR fields generated for the kinds of fields.
+
+    Args:
+        fields (list): kinds of fields
+
+    Returns:
+        list: name and OGR kind of the fields
+
+    """
+
+    from osgeo import ogr
+    __fields = []
+    for __kind in fields:
+        if __kind == 'int':
+            __fields.append(('f_int', ogr.OFTInteger))
+        elif __kind == 'float':
+            __fields.append(('f_float', ogr.OFTReal))
+        elif __kind == 'date':
+            __fields.append(('f_date', ogr.OFTDate))
+        elif __kind == 'mistyped':
+            __fields += [
+                ('m_int', ogr.OFTString),
+                ('m_long', ogr.OFTString),
+                ('m_float', ogr.OFTString),
+                ('m_date', ogr.OFTString)
+            ]
+        else:
+            __fields.append(('f_' + __kind, ogr.OFTString))
+
+    return __fields
+
+
+def get_value(name, rnd, index):
+    """ This function returns a random value for
+        a generated field.
+
+    Args:
+        name (string): field's name
+        rnd (Random): random generator
+        index (int): feature's index
+
+    Returns:
+        object: value or None
+
+    """
+
+    # Kinds with native values
+    if name == 'f_int':
+        return index
+    elif name == 'f_float':
+        return rnd.uniform(-1000, 1000)
+    elif name == 'f_date' or name == 'm_date':
+
+        # Mistyped dates are ISO or month first (mm/dd/yyyy),
+        # the same convention used to read ambiguous dates
+        __y, __m, __d = \
+            rnd.randint(1950, 2017), rnd.randint(1, 12), rnd.randint(1, 28)
+        return '%04d-%02d-%02d' % (__y, __m, __d) \
+            if name == 'f_date' or rnd.random() < 0.5 else \
+            '%02d/%02d/%04d' % (__m, __d, __y)
+
+    # Kinds saved as strings
+    elif name == 'm_int':
+        return str(rnd.randint(-100000, 100000))
+    elif name == 'm_long':
+        return str(rnd.randint(2 ** 40, 2 ** 50))
+    elif name == 'm_float':
+        return '%.4f' % rnd.uniform(-1000, 1000)
+    elif name == 'f_empty':
+        return None if rnd.random() < 0.995 else 'x'
+
+    # Words with or without accents
+    return ' '.join(
+        rnd.choice(generator_words) for __n in range(0, 3)
+    ) if name == 'f_latin1' else 'value ' + str(index)
+
+
+def get_ring(rnd, x, y, radius, vertices, invalid):
+    """ This function returns a closed ring around
+        a point, the ring crosses itself if it is invalid.
+
+    Args:
+        rnd (Random): random generator
+        x (float): longitude of the center
+        y (float): latitude of the center
+        radius (float): maximum radius
+        vertices (int): number of vertices
+        invalid (bool): self-intersecting ring flag
+
+    Returns:
+        list: points of the ring
+
+    """
+
+    # Generate points sorted by angle
+    __points = []
+    for __n in range(0, vertices):
+        __angle = 2 * math.pi * __n / vertices
+        __radius = radius * rnd.uniform(0.5, 1.0)
+        __points.append((
+            x + __radius * math.cos(__angle),
+            y + __radius * math.sin(__angle)
+        ))
+
+    # Swap two vertices to generate a bow-tie
+    if invalid:
+        __points[0], __points[1] = __points[1], __points[0]
+
+    return __points + [__points[0]]
+
+
+def get_geometry(rnd, kind, vertices, invalid):
+    """ This function returns a random geometry.
+
+    Args:
+        rnd (Random): random generator
+        kind (string): kind of geometry
+        vertices (int): number of vertices
+        invalid (bool): invalid geometry flag
+
+    Returns:
+        Geometry: OGR geometry or None
+
+    """
+
+    from osgeo import ogr
+
+    # Invalid points and lines have not geometry
+    if invalid and kind in ['point', 'line']:
+        return None
+
+    # Get center of the geometry
+    __x = rnd.uniform(-10.0, 4.0)
+    __y = rnd.uniform(36.0, 44.0)
+
+    # Generate geometry depending on kind
+    if kind == 'point':
+        __geom = ogr.Geometry(ogr.wkbPoint)
+        __geom.AddPoint_2D(__x, __y)
+    elif kind == 'line':
+        __geom = ogr.Geometry(ogr.wkbLineString)
+        for __n in range(0, max(vertices, 2)):
+            __geom.AddPoint_2D(__x, __y)
+            __x += rnd.uniform(-0.01, 0.01)
+            __y += rnd.uniform(-0.01, 0.01)
+    else:
+        __geom = ogr.Geometry(
+            ogr.wkbPolygon if kind == 'polygon' else ogr.wkbMultiPolygon
+        )
+        for __n in range(0, 1 if kind == 'polygon' else 2):
+            __ring = ogr.Geometry(ogr.wkbLinearRing)
+            for __point in get_ring(
+                rnd, __x + __n * 0.05, __y, 0.02,
+                max(vertices, 4), invalid
+            ):
+                __ring.AddPoint_2D(*__point)
+            if kind == 'polygon':
+                __geom.AddGeometry(__ring)
+            else:
+                __polygon = ogr.Geometry(ogr.wkbPolygon)
+                __polygon.AddGeometry(__ring)
+                __geom.AddGeometry(__polygon)
+
+    return __geom
+
+
+def generate_dataset(path, features, geometry='polygon', vertices=8,
+                     fields=None, invalid=0.0, seed=0):
+    """ This function writes a synthetic geo-spatial file
+        with WGS84 features. The format depends on the
+        extension of the path (.shp, .kml, .geojson, .csv).
+
+    Args:
+        path (string): file's path
+        features (int): number of features
+        geometry (string): kind of geometry
+        vertices (int): vertices per line or ring
+        fields (list): kinds of fields (default all)
+        invalid (float): ratio of invalid geometries
+        seed (int): seed of the random generator
+
+    Returns:
+        string: file's path
+
+    """
+
+    # Get driver depending on extension
+    from osgeo import ogr, osr
+    __extension = os.path.splitext(path)[1]
+    __file = ogr.GetDriverByName(generator_drivers[__extension])
+
+    # Delete previous file
+    if os.path.exists(path):
+        __file.DeleteDataSource(path)
+
+    # Get options of the layer
+    __fields = generator_fields if fields is None else fields
+    __options = list(generator_options[__extension])
+    if __extension == '.shp':
+        __options.append(
+            'ENCODING=ISO-8859-1' if 'latin1' in __fields else
+            'ENCODING=UTF-8'
+        )
+
+    # Create file and layer
+    __srs = osr.SpatialReference()
+    __srs.ImportFromEPSG(4326)
+    __src = __file.CreateDataSource(path)
+    __layer = __src.CreateLayer(
+        os.path.splitext(os.path.basename(path))[0], __srs, {
+            'point': ogr.wkbPoint,
+            'line': ogr.wkbLineString,
+            'polygon': ogr.wkbPolygon,
+            'multipolygon': ogr.wkbMultiPolygon
+        }[geometry], __options
+    )
+
+    # Create fields of the layer
+    __fields = get_ogr_fields(__fields)
+    for __name, __kind in __fields:
+        __layer.CreateField(ogr.FieldDefn(__name, __kind))
+    __layer_def = __layer.GetLayerDefn()
+
+    # Write features
+    __rnd = random.Random(seed)
+    for __index in range(0, features):
+        __feat = ogr.Feature(__layer_def)
+        for __name, __kind in __fields:
+            __value = get_value(__name, __rnd, __index)
+            if __value is not None:
+                __feat.SetField(__name, __value)
+        __geom = get_geometry(
+            __rnd, geometry, vertices, __rnd.random() < invalid
+        )
+        if __geom is not None:
+            __feat.SetGeometry(__geom)
+        __layer.CreateFeature(__feat)
+
+    # Close file
+    __layer = None
+    __src = None
+
+    return path
+
+
+##########################################################################
+
+
+def main_script():
+    """ This function allows you to run the generator from command
+        line. It accepts arguments and options as you can see below these
+        comments.
+
+    """
+
+    # Create configuration for command line
+    parser = argparse.ArgumentParser(
+        description='This software generates synthetic geo-spatial \
+            files (Shapefile, KML, GeoJSON or CSV) to test the GIS \
+            Worker with any number of features.',
+        usage='gis_worker_generator.py [-h] [-n n] [-g kind] [-v n] '
+              '[-f kind [kind ...]] [-b ratio] [-s n] path'
+    )
+    parser.add_argument(
+        'path', metavar='path',
+        help='file to generate (.shp, .kml, .geojson or .csv).'
+    )
+    parser.add_argument(
+        '-n', '--features', type=int, default=1000, metavar='n',
+        help='number of features.'
+    )
+    parser.add_argument(
+        '-g', '--geometry', default='polygon', metavar='kind',
+        choices=generator_geometries,
+        help='kind of geometry (' + ', '.join(generator_geometries) + ').'
+    )
+    parser.add_argument(
+        '-v', '--vertices', type=int, default=8, metavar='n',
+        help='vertices per line or polygon ring.'
+    )
+    parser.add_argument(
+        '-f', '--fields', nargs='+', default=generator_fields,
+        metavar='kind', choices=generator_fields,
+        help='kinds of fields (' + ', '.join(generator_fields) + ').'
+    )
+    parser.add_argument(
+        '-b', '--invalid', type=float, default=0.0, metavar='ratio',
+        help='ratio of features without geometry or with\n'
+             'self-intersecting polygons.'
+    )
+    parser.add_argument(
+        '-s', '--seed', type=int, default=0, metavar='n',
+        help='seed of the random generator.'
+    )
+
+    # Get parameters from CLI
+    __args = parser.parse_args()
+
+    # Check extension of the file
+    if os.path.splitext(__args.path)[1] not in generator_drivers:
+        parser.error('extension must be .shp, .kml, .geojson or .csv')
+
+    generate_dataset(
+        __args.path, __args.features, __args.geometry, __args.vertices,
+        __args.fields, __args.invalid, __args.seed
+    )
+
+
+if __name__ == "__main__":
+
+    main_script()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import settings
+from datetime import datetime
+
+if sys.version_info < (3, 0):
+    reload(sys)
+    sys.setdefaultencoding('utf8')
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+config = settings.Config()
+
+# Version of the transformation pipeline, it must be
+# increased when the generated files or information change
+cache_version = '5'
+
+# Folders of the transformation saved at cache
+cache_folders = ['shp', 'trs']
+
+# File with the information of an entry, its modification
+# time is the last time the entry was used
+cache_information = 'information.json'
+
+# Header of the messages of a transformation, its date
+# is refreshed when the entry is loaded
+cache_header = re.compile(
+    r'^(GDAL transformation - )\d{4}-\d{2}-\d{2} \d{2}:\d{2}'
+)
+
+
+##########################################################################
+
+
+def sha256_file(path):
+    """ This function allows to generate the SHA 256
+        of the content of specific file.
+
+    Args:
+        path (string): file's path
+
+    Returns:
+        string: SHA 256
+
+    """
+
+    __sha = hashlib.sha256()
+    with open(path, 'rb') as __file:
+        __block = __file.read(65536)
+        while len(__block) > 0:
+            __sha.update(__block)
+            __block = __file.read(65536)
+
+    return __sha.hexdigest().lower()
+
+
+def get_cache_key(path):
+    """ This function allows to generate the key of the
+        transformation of specific file. It depends on its
+        content, its name and the version and configuration
+        of the transformation pipeline.
+
+    Args:
+        path (string): file's path
+
+    Returns:
+        string: key of the cache
+
+    """
+
+    return hashlib.sha256('-'.join([
+        sha256_file(path), os.path.basename(path), cache_version,
+        str(config.gis_export), str(config.gis_profile_cap),
+        str(config.gis_profile_precision), str(config.gis_inference_chunk),
+        str(config.gis_memory), str(config.gis_centroid),
+        str(config.gis_engine)
+    ])).hexdigest().lower()
+
+
+def copy_folder(src_path, dst_path):
+    """ This function allows to copy the files of a folder
+        to other folder. Files are not linked, so the files
+        of a task can be modified without changing the
+        files saved at cache.
+
+    Args:
+        src_path (string): source folder's path
+        dst_path (string): destination folder's path
+
+    """
+
+    # Create destination folder
+    os.mkdir(dst_path)
+
+    # Iterate over files
+    for __f in os.listdir(src_path):
+        shutil.copy2(
+            os.path.join(src_path, __f),
+            os.path.join(dst_path, __f)
+        )
+
+
+def get_folder_size(path):
+    """ This function allows to get the size
+        of the files of a folder.
+
+    Args:
+        path (string): folder's path
+
+    Returns:
+        int: size (bytes)
+
+    """
+
+    __size = 0
+    for __root, __dirs, __files in os.walk(path):
+        for __f in __files:
+            try:
+                __size += os.path.getsize(os.path.join(__root, __f))
+            except OSError:
+                pass
+
+    return __size
+
+
+def evict_cache():
+    """ This function allows to remove the entries of the
+        cache that are not used for longer than the configured
+        age and the least recently used ones while the cache
+        is greater than the configured size. Entries are
+        renamed before removing them, so other worker never
+        loads a partial entry.
+
+    """
+
+    # Check if there is any limit
+    if not config.gis_cache_size and not config.gis_cache_age:
+        return
+
+    # Get published entries with their last use and size
+    __entries = []
+    for __key in os.listdir(config.gis_cache_folder):
+        if '.' in __key:
+            continue
+        __cache_path = os.path.join(config.gis_cache_folder, __key)
+        try:
+            __entries.append((
+                os.path.getmtime(
+                    os.path.join(__cache_path, cache_information)
+                ), get_folder_size(__cache_path), __key
+            ))
+        except OSError:
+            continue
+
+    # Sort entries from least recently used
+    __entries.sort()
+    __size = sum(__entry[1] for __entry in __entries)
+    __limit_size = config.gis_cache_size * 1024 * 1024
+    __limit_time = time.time() - config.gis_cache_age * 86400
+
+    for __used, __entry_size, __key in __entries:
+
+        # Check if entry is recent and cache fits
+        if (not config.gis_cache_age or __used >= __limit_time) and \
+           (not config.gis_cache_size or __size <= __limit_size):
+            break
+
+        # Remove entry, other worker could remove it before
+        __cache_path = os.path.join(config.gis_cache_folder, __key)
+        __cache_tmp = __cache_path + '.' + str(os.getpid()) + '.evict'
+        try:
+            os.rename(__cache_path, __cache_tmp)
+        except OSError:
+            continue
+        shutil.rmtree(__cache_tmp, ignore_errors=True)
+        __size -= __entry_size
+
+
+def refresh_messages(messages):
+    """ This function allows to set the current date at
+        the headers of the messages of a transformation.
+
+    Args:
+        messages (dict): messages of the transformation
+
+    Returns:
+        dict: messages
+
+    """
+
+    __date = r'\g<1>' + datetime.now().strftime('%Y-%m-%d %H:%M')
+    for __kind in messages:
+        if isinstance(messages[__kind], list):
+            messages[__kind] = [
+                cache_header.sub(__date, __m) for __m in messages[__kind]
+            ]
+
+    return messages
+
+
+def load_cache(key, path):
+    """ This function allows to get a saved transformation
+        and to create its files at the folder of the task.
+
+    Args:
+        key (string): key of the cache
+        path (string): task folder's path
+
+    Returns:
+        dict: information about the outputs or None
+
+    """
+
+    # Check if cache is enabled
+    if not config.gis_cache_folder:
+        return None
+
+    # Check if key is saved
+    __cache_path = os.path.join(config.gis_cache_folder, key)
+    __cache_info = os.path.join(__cache_path, cache_information)
+    if not os.path.isfile(__cache_info):
+        return None
+
+    try:
+
+        # Load information about the outputs
+        with open(__cache_info) as __file_data:
+            __info = json.load(__file_data)
+
+        # Create files of the task
+        for __folder in cache_folders:
+            if os.path.isdir(os.path.join(__cache_path, __folder)):
+                copy_folder(
+                    os.path.join(__cache_path, __folder),
+                    os.path.join(path, __folder)
+                )
+
+        # Save last use of the entry
+        os.utime(__cache_info, None)
+
+        # Refresh date of the messages
+        if isinstance(__info.get('messages'), dict):
+            refresh_messages(__info['messages'])
+
+    except (IOError, OSError):
+
+        # Entry was evicted while it was loaded
+        for __folder in cache_folders:
+            shutil.rmtree(
+                os.path.join(path, __folder), ignore_errors=True
+            )
+        return None
+
+    return __info
+
+
+def save_cache(key, path, information):
+    """ This function allows to save a transformation
+        with its files at the cache. The entry is written
+        at a temporal folder and renamed when it is completed.
+
+    Args:
+        key (string): key of the cache
+        path (string): task folder's path
+        information (dict): information about the outputs
+
+    """
+
+    # Check if cache is enabled
+    if not config.gis_cache_folder:
+        return
+
+    # Check if key is already saved
+    __cache_path = os.path.join(config.gis_cache_folder, key)
+    if os.path.isdir(__cache_path):
+        return
+
+    # Create temporal entry
+    __cache_tmp = __cache_path + '.' + str(os.getpid())
+    shutil.rmtree(__cache_tmp, ignore_errors=True)
+    os.makedirs(__cache_tmp)
+
+    # Save files of the task
+    for __folder in cache_folders:
+        if os.path.isdir(os.path.join(path, __folder)):
+            copy_folder(
+                os.path.join(path, __folder),
+                os.path.join(__cache_tmp, __folder)
+            )
+
+    # Save information about the outputs
+    with open(os.path.join(__cache_tmp, cache_information), 'w') as __f:
+        json.dump(information, __f)
+
+    # Publish entry, other worker could publish it before
+    try:
+        os.rename(__cache_tmp, __cache_path)
+    except OSError:
+        shutil.rmtree(__cache_tmp, ignore_errors=True)
+
+    # Remove old entries to keep the limits of the cache
+    evict_cache()
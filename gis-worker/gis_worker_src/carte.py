@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import os
+import re
+import sys
+import time
+import uuid
+import zlib
+import base64
+import urllib
+import urllib2
+import settings
+import defusedxml.ElementTree
+
+if sys.version_info < (3, 0):
+    reload(sys)
+    sys.setdefaultencoding('utf8')
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+config = settings.Config()
+
+# Servlets and XML nodes of Carte for each kind of file
+carte_kinds = {
+    '.ktr': {
+        'add': 'addTrans', 'start': 'startTrans', 'status': 'transStatus',
+        'stop': 'stopTrans', 'remove': 'removeTrans',
+        'root': 'transformation', 'directory': 'Transformation'
+    },
+    '.kjb': {
+        'add': 'addJob', 'start': 'startJob', 'status': 'jobStatus',
+        'stop': 'stopJob', 'remove': 'removeJob',
+        'root': 'job', 'directory': 'Job'
+    }
+}
+
+# Lines of the Carte log (yyyy/MM/dd HH:mm:ss - subject - message)
+carte_log_line = re.compile(
+    r'^(\d{4})/(\d{2})/(\d{2}) (\d{2}:\d{2}:\d{2}) - (.*)$'
+)
+
+
+##########################################################################
+
+
+def carte_request(servlet, parameters, data=None):
+    """ This function executes a request to a servlet
+        of Carte and returns its XML response.
+
+    Args:
+        servlet (string): servlet's name
+        parameters (dict): parameters of the URL
+        data (string): XML sent as body (POST)
+
+    Returns:
+        Element: XML response
+
+    """
+
+    # Generate URL of the servlet
+    __parameters = dict(parameters)
+    __parameters['xml'] = 'Y'
+    __url = config.xml_carte_url.rstrip('/') + '/kettle/' + servlet + \
+        '/?' + urllib.urlencode(__parameters)
+
+    # Generate request with basic authentication
+    __request = urllib2.Request(__url, data)
+    __request.add_header('Authorization', 'Basic ' + base64.b64encode(
+        config.xml_carte_user + ':' + config.xml_carte_password
+    ))
+    if data is not None:
+        __request.add_header('Content-Type', 'text/xml; charset=utf-8')
+
+    # Execute request
+    __response = urllib2.urlopen(__request, timeout=30)
+    try:
+        return defusedxml.ElementTree.fromstring(__response.read())
+    finally:
+        __response.close()
+
+
+def check_carte():
+    """ This function checks if Carte is running.
+
+    Returns:
+        bool: True if Carte answers, False otherwise
+
+    """
+
+    try:
+        carte_request('status', {})
+        return True
+    except Exception:
+        return False
+
+
+def get_carte_configuration(path, kind, name):
+    """ This function generates the configuration sent to
+        Carte for a transformation or job. The internal
+        variables of the folder are replaced because the
+        file is sent without its path.
+
+    Args:
+        path (string): file's path
+        kind (dict): servlets and nodes of the kind of file
+        name (string): unique name at Carte
+
+    Returns:
+        string: XML configuration
+
+    """
+
+    # Read file replacing folder variables
+    with open(path, 'r') as __file:
+        __xml = __file.read().replace(
+            '${Internal.' + kind['directory'] + '.Filename.Directory}',
+            os.path.dirname(os.path.abspath(path))
+        )
+
+    # Set unique name, so other executions do not collide
+    __root = defusedxml.ElementTree.fromstring(__xml)
+    __name = __root.find('info/name') if kind['root'] == \
+        'transformation' else __root.find('name')
+    if __name is not None:
+        __name.text = name
+
+    __xml = defusedxml.ElementTree.tostring(__root, encoding='utf-8')
+    return '<' + kind['root'] + '_configuration>' + \
+        __xml.split('?>', 1)[-1] + \
+        '<' + kind['root'] + '_execution_configuration>' + \
+        '<log_level>Detailed</log_level>' + \
+        '</' + kind['root'] + '_execution_configuration>' + \
+        '</' + kind['root'] + '_configuration>'
+
+
+def format_carte_log(log):
+    """ This function formats the log of Carte with the
+        same format of pan.sh and kitchen.sh output, so
+        it can be parsed with parse_geo_return.
+
+    Args:
+        log (string): Carte log
+
+    Returns:
+        string: formatted log
+
+    """
+
+    __lines = []
+    for __line in log.split('\n'):
+        __match = carte_log_line.match(__line.rstrip('\r'))
+        if __match is None:
+            __lines.append(__line)
+            continue
+        __year, __month, __day, __time, __message = __match.groups()
+        __lines.append('%-5s %s-%s %s,000 - %s' % (
+            'ERROR' if ' - ERROR' in __message else 'INFO',
+            __day, __month, __time, __message
+        ))
+
+    return '\n'.join(__lines)
+
+
+def exec_carte(path):
+    """ This function executes a GeoKettle transformation
+        or job at a running Carte server, so the JVM is not
+        started for each execution.
+
+    Args:
+        path (string): file's path
+
+    Returns:
+        triple: output, errors and reason if execution failed.
+
+    """
+
+    # Get kind of file
+    __kind = carte_kinds[os.path.splitext(path)[1]]
+    __name = os.path.splitext(os.path.basename(path))[0] + \
+        '-' + uuid.uuid4().hex[:12]
+
+    try:
+
+        # Send and start transformation or job
+        __result = carte_request(
+            __kind['add'], {},
+            get_carte_configuration(path, __kind, __name)
+        )
+        if __result.findtext('result') != 'OK':
+            return '', '', 'Carte did not accept the file: ' + \
+                str(__result.findtext('message'))
+        __parameters = {'name': __name}
+        if __result.findtext('id'):
+            __parameters['id'] = __result.findtext('id')
+        carte_request(__kind['start'], __parameters)
+
+        # Wait for the end of the execution
+        __start = time.time()
+        while True:
+            __status = carte_request(__kind['status'], __parameters)
+            if not __status.findtext('status_desc', '').startswith(
+                    ('Running', 'Initializing', 'Preparing', 'Waiting')):
+                break
+            if 0 < config.gis_timeout < time.time() - __start:
+                carte_request(__kind['stop'], __parameters)
+                return '', '', 'The execution at Carte was stopped ' \
+                    'after ' + str(config.gis_timeout) + \
+                    ' seconds (time limit).'
+            time.sleep(0.5)
+
+        # Get log of the execution (gzip + base64)
+        __log = __status.findtext('logging_string', '').strip()
+        __log = zlib.decompress(
+            base64.b64decode(__log), 16 + zlib.MAX_WBITS
+        ) if __log else ''
+
+        # Remove execution from Carte
+        try:
+            carte_request(__kind['remove'], __parameters)
+        except Exception:
+            pass
+
+        return format_carte_log(__log), \
+            __status.findtext('error_desc', ''), None
+
+    except Exception as e:
+        return '', '', 'Carte is not available: ' + str(e)
@@ -13,10 +13,16 @@
 #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
 """
 
+import os
 import sys
+import json
 import time
+import uuid
+import zlib
 import redis
 import settings
+from threading import Thread, Event
+from contextlib import contextmanager
 from redis import TimeoutError, ConnectionError
 
 if sys.version_info < (3, 0):
@@ -37,10 +43,22 @@ __email__ = "alejfcarrera@mail.ru"
 config = settings.Config()
 
 
+# Version of the document with the layers and fields of a task
+metadata_version = 1
+
+# Redis clients shared by the tasks of the process, they
+# are created again if the process is forked (Celery workers)
+redis_clients = None
+redis_clients_pid = None
+redis_clients_status = False
+
+
 def create_redis_pool(redis_host, redis_port, redis_pass, redis_db):
     """ This function creates a connection pool for Redis Database
         with a specific configuration. This is important to create
-        connections and execute queries easily.
+        connections and execute queries easily. Connections are
+        created when they are used and created again if they are
+        broken, so the pool does not connect to Redis here.
 
     Args:
         redis_host (string): host where Redis is available
@@ -49,78 +67,147 @@ def create_redis_pool(redis_host, redis_port, redis_pass, redis_db):
         redis_db (int): database for Redis client
 
     Returns:
-        class: Redis Pool or None if something went wrong
+        class: Redis Pool
 
     """
 
-    __redis_pool = redis.ConnectionPool(
+    return redis.ConnectionPool(
         socket_connect_timeout=5,
+        socket_keepalive=True,
+        retry_on_timeout=True,
         host=redis_host,
         port=redis_port,
         password=redis_pass,
         db=redis_db
     )
+
+
+def check_redis(connections):
+    """ This function detects if Redis is running. Connection
+        pools are disconnected if it is not running, so broken
+        connections are not used again.
+
+    Args:
+        connections (dict): Redis connections
+
+    Returns:
+        bool: True if Redis is running, False otherwise
+
+    """
+
+    global redis_clients_status
+
     try:
 
-        # Detect if Redis is running
-        __connection = __redis_pool.get_connection('ping')
-        __connection.send_command('ping')
-        return __redis_pool
+        # Detect if Redis is running (all the databases
+        # are at the same server)
+        connections['tasks'].ping()
+        redis_clients_status = True
 
     except (ConnectionError, TimeoutError):
 
-        # Disconnect connection pool
-        __redis_pool.disconnect()
+        # Disconnect connection pools
+        for __redis_name in connections:
+            connections[__redis_name].connection_pool.disconnect()
+        redis_clients_status = False
+
+    return redis_clients_status
+
 
-        return None
+def check_redis_health(connections, seconds):
+    """ This function checks periodically if Redis is running,
+        it is executed at background while the process is alive.
+
+    Args:
+        connections (dict): Redis connections
+        seconds (int): time between checks
+
+    """
+
+    while True:
+        time.sleep(seconds)
+        check_redis(connections)
 
 
 def configure_redis(configuration):
     """ This function creates a connection pool for any of Redis
-        configuration saved on configuration parameter.
+        configuration saved on configuration parameter. Pools are
+        created once per process and shared by all the tasks.
 
     Args:
         configuration (dict): settings for Redis
 
     Returns:
-        dict: Redis connection pools
+        dict: Redis connection pools or None if Redis is not running
 
     """
 
-    __number_redis = 0
-    __redis_connections = {}
-    __redis_pools = {}
+    global redis_clients, redis_clients_pid
 
     # Generate connection pools to Redis Database
-    for __redis_name in configuration['dbs']:
-
-        # Create new connection pool
-        __redis_pools[__redis_name] = create_redis_pool(
-            configuration['host'], configuration['port'],
-            configuration['pass'], __number_redis
+    if redis_clients is None or redis_clients_pid != os.getpid():
+        __redis_connections = {}
+        for __number_redis, __redis_name in \
+                enumerate(configuration['dbs']):
+            __redis_connections[__redis_name] = redis.Redis(
+                connection_pool=create_redis_pool(
+                    configuration['host'], configuration['port'],
+                    configuration['pass'], __number_redis
+                )
+            )
+        redis_clients = __redis_connections
+        redis_clients_pid = os.getpid()
+
+        # Check Redis now and later at background
+        check_redis(redis_clients)
+        __health = Thread(
+            target=check_redis_health,
+            args=(redis_clients, configuration['health'])
         )
+        __health.daemon = True
+        __health.start()
 
-        # Test connection pool
-        if __redis_pools[__redis_name] is None:
+    # Check Redis again if last check failed,
+    # pools are reconnected when it is running
+    elif not redis_clients_status:
+        check_redis(redis_clients)
 
-            # Disconnect other connection pools
-            for __redis_pool_name in __redis_pools.keys():
-                if __redis_pools[__redis_pool_name] is not None:
-                    __redis_pools[__redis_pool_name].disconnect()
+    return redis_clients if redis_clients_status else None
 
-            return None
 
-        else:
+def encode_metadata(metadata):
+    """ This function encodes the document of a task,
+        it is compressed if configuration says it.
 
-            # Save connection to structure
-            __redis_connections[__redis_name] = redis.Redis(
-                connection_pool=__redis_pools[__redis_name]
-            )
+    Args:
+        metadata (dict): document of the task
+
+    Returns:
+        string: encoded document
+
+    """
 
-        # Add new number for next connection pool
-        __number_redis += 1
+    __metadata = json.dumps(metadata, separators=(',', ':'))
 
-    return __redis_connections
+    return zlib.compress(__metadata) \
+        if config.redis_worker['compress'] else __metadata
+
+
+def decode_metadata(metadata):
+    """ This function decodes the document of a task,
+        compressed or not (JSON documents start with '{').
+
+    Args:
+        metadata (string): encoded document
+
+    Returns:
+        dict: document of the task
+
+    """
+
+    return json.loads(
+        metadata if metadata.startswith('{') else zlib.decompress(metadata)
+    )
 
 
 ##########################################################################
@@ -138,7 +225,8 @@ class WorkerRedis(object):
 
     def __init__(self):
 
-        # Execute method to create new instance of Redis - Worker
+        # Execute method to create new instance of Redis - Worker, the
+        # databases are the same of the portal (same order)
         # 0) tasks - Control about lock / unlock tasks
         # 1) status - Status about finished tasks
         # 2) messages - Messages with information (backtrace)
@@ -149,6 +237,82 @@ class WorkerRedis(object):
         # 7) mapping-e - Extended mapping
         self.redis = configure_redis(config.redis_worker)
 
+        # Pipelines of the current batch of writes
+        self.pipelines = None
+
+        # Lease lock of the current task
+        self.lease = None
+
+    @contextmanager
+    def batch(self):
+        """ This function allows to send the writes done with
+            the with statement as one MULTI/EXEC transaction per
+            database (pipeline), so a task does not wait for a
+            round trip per key. Nested batches are sent with the
+            outer one. If the task has a lock, the writes are sent
+            with the check of the lock as one script, so they are
+            rejected if other worker took the lock.
+
+        """
+
+        # Check if other batch is running
+        if self.pipelines is not None:
+            yield
+            return
+
+        # Create pipelines when they are used
+        self.pipelines = {}
+        try:
+            yield
+            if self.lease is not None:
+                if not self.lease.write(self.pipelines):
+                    raise Exception(
+                        'Lock of the task was taken by other worker'
+                    )
+            else:
+                for __d in self.pipelines:
+                    self.pipelines[__d].execute()
+        finally:
+            for __d in self.pipelines:
+                self.pipelines[__d].reset()
+            self.pipelines = None
+
+    def register_records(self, identifier, database, keys):
+        """ This function allows to add keys to the registry
+            of a task at a database. The registry is written
+            at the same transaction of the keys, so it is
+            updated atomically by the writers.
+
+        Args:
+            identifier (string): task internal id
+            database (string): identifier of db
+            keys (list): keys of the task
+
+        """
+
+        if len(keys):
+            self.get_pipeline(database).sadd(
+                identifier + ':keys', *keys
+            )
+
+    def get_pipeline(self, database):
+        """ This function allows to get the pipeline of
+            the current batch for a database.
+
+        Args:
+            database (string): identifier of db
+
+        Returns:
+            Pipeline: Redis pipeline
+
+        """
+
+        if database not in self.pipelines:
+            self.pipelines[database] = \
+                self.redis[database].pipeline(transaction=True)
+
+        return self.pipelines[database]
+
     def get_information(self, identifier):
         """ This function allows to get all the information
             from a specific key.
@@ -181,7 +345,7 @@ class WorkerRedis(object):
         # Return status
         return self.redis[database].exists(identifier)
 
-    def remove_records(self, identifier, mapping, files=False):
+    def remove_records(self, identifier, mapping, files=False, keep=()):
         """ This function allows to delete the information
             and all the fields for specific identifier.
 
@@ -189,77 +353,217 @@ class WorkerRedis(object):
             identifier (string): key to delete it
             mapping (string): kind of mapping
             files (bool): flag to delete links / layers
+            keep (list): keys of the registries that are not deleted
 
         """
 
-        # Remove any other trace
-        for __d in [mapping, 'messages']:
-            for __k in self.redis[__d].scan_iter(identifier + '*'):
-                self.redis[__d].delete(__k)
+        # Tasks uploaded before the registry of keys
+        # have not registry at files database
+        __legacy = not self.redis['files'].exists(identifier + ':keys')
+
+        # Remove any other trace, only the keys at the
+        # registry of the task are deleted (locks are not)
+        for __d in [mapping, 'messages', 'tasks']:
+            self.remove_registry(
+                identifier, __d, __legacy and __d != 'tasks', keep
+            )
+
+        # Remove document of the layers and fields
+        self.redis['files'].delete(identifier + ':metadata')
+
+        # Remove fencing counter of the lock, the fence of
+        # the current owner is saved with its token
+        self.redis['tasks'].delete(identifier + ':' + mapping + ':fence')
 
-        # Delete everything if flag is activated
+        # Delete everything if flag is activated, the
+        # registry of files is the last removed key
         if files:
             self.redis['files'].delete(identifier)
+            self.remove_registry(identifier, 'files')
 
-    def save_record_info(self, identifier, layers, layers_md5, layers_info):
-        """ This function allows to save the new parameters.
+    def remove_registry(self, identifier, database, legacy=False,
+                        keep=()):
+        """ This function allows to delete the keys at the
+            registry of a task and then the registry. Keys of
+            tasks saved without registry are searched by the
+            identifier (whole database) if legacy flag is set.
+            Kept keys are not deleted and stay at the registry.
+
+        Args:
+            identifier (string): task internal id
+            database (string): identifier of db
+            legacy (bool): flag to search keys without registry
+            keep (list): keys that are not deleted
+
+        """
+
+        __redis = self.redis[database]
+        __registry = identifier + ':keys'
+
+        # Check if registry does not exist
+        if not __redis.exists(__registry):
+            if legacy:
+                for __k in __redis.scan_iter(identifier + '*'):
+                    if __k not in keep:
+                        __redis.delete(__k)
+            return
+
+        # Delete keys and then registry if no key is kept
+        __members = __redis.smembers(__registry)
+        __keys = [__k for __k in __members if __k not in keep]
+        __pipe = __redis.pipeline(transaction=True)
+        if len(__keys):
+            __pipe.delete(*__keys)
+        if len(__keys) == len(__members):
+            __pipe.delete(__registry)
+        elif len(__keys):
+            __pipe.srem(__registry, *__keys)
+        __pipe.execute()
+
+    def save_record_metadata(self, identifier, layers, layers_md5,
+                             layers_info, layers_fields):
+        """ This function allows to save the layers, their
+            information and the kind and profile of their fields
+            as one versioned document (JSON compressed with zlib).
 
         Args:
             identifier (string): key where save information
             layers (list): transformed files' names
             layers_md5 (dict): relations between ids and names
             layers_info (list): transformed files' properties
-        
+            layers_fields (list): transformed files' fields
+
         """
 
-        # Save data to database
-        for __k in range(0, len(layers)):
+        # Create document of the task
+        __metadata = {
+            'version': metadata_version,
+            'layers': [{
+                'id': layers[__k],
+                'name': layers_md5[layers[__k]],
+                'info': layers_info[__k],
+                'fields': layers_fields[__k]['values'],
+                'profile': {
+                    __f: layers_fields[__k]['profile'][__f]
+                    for __f in layers_fields[__k]['values']
+                }
+            } for __k in range(0, len(layers))]
+        }
+
+        # Save document to database
+        with self.batch():
+            self.get_pipeline('files').set(
+                identifier + ':metadata', encode_metadata(__metadata)
+            )
+            self.register_records(
+                identifier, 'files', [identifier + ':metadata']
+            )
 
-            # Get identifier of layer
-            __layer = layers[__k]
+    def get_record_metadata(self, identifier):
+        """ This function allows to get the document with the
+            layers and fields of a task (one GET). Tasks saved
+            with the previous keys are migrated.
 
-            # Set layer name
-            self.redis['files'].set(
-                identifier + ':layer:' +
-                __layer + ':name',
-                layers_md5[__layer]
-            )
+        Args:
+            identifier (string): task internal id
 
-            # Set layer information
-            self.redis['files'].hmset(
-                identifier + ':layer:' +
-                __layer + ':info',
-                layers_info[__k]
-            )
+        Returns:
+            dict: document of the task or None
+
+        """
+
+        # Get document from database
+        __metadata = self.redis['files'].get(identifier + ':metadata')
+        if __metadata is not None:
+            return decode_metadata(__metadata)
+
+        return self.migrate_record_metadata(identifier)
 
-    def save_record_fields(self, identifier, layers, layers_fields):
-        """ This function allows to save the new parameters.
+    def migrate_record_metadata(self, identifier):
+        """ This function allows to migrate the layers and fields
+            of a task saved with the previous keys (one string and
+            one hash per layer at files and one hash per layer at
+            mapping-i with values as "kind - duplicated") to the
+            document of the task.
 
         Args:
-            identifier (string): key where save information
-            layers (list): transformed files' names
-            layers_fields (dict): transformed files' fields
+            identifier (string): task internal id
+
+        Returns:
+            dict: document of the task or None
 
         """
 
-        # Save data to database
-        for __k in range(0, len(layers)):
+        # Get layers from previous keys
+        __prefix = identifier + ':layer:'
+        __keys = sorted(
+            self.redis['files'].scan_iter(__prefix + '*:name')
+        )
+        if not len(__keys):
+            return None
+
+        # Create document of the task
+        __metadata = {'version': metadata_version, 'layers': []}
+        __old = {'files': [], 'mapping-i': []}
+        for __key in __keys:
+            __layer = __key[len(__prefix):-len(':name')]
+
+            # Get kind and duplicated flag of the fields
+            __fields = {}
+            __profile = {}
+            for __f, __v in self.redis['mapping-i'].hgetall(
+                    __prefix + __layer).items():
+                __kind, __dup = __v.rsplit(' - ', 1)
+                __fields[__f] = __kind
+                __profile[__f] = {'unique': int(not int(__dup))}
+
+            __metadata['layers'].append({
+                'id': __layer,
+                'name': self.redis['files'].get(__key),
+                'info': self.redis['files'].hgetall(
+                    __prefix + __layer + ':info'
+                ),
+                'fields': __fields,
+                'profile': __profile
+            })
+
+            # Save previous keys of the layer
+            __old['files'] += [__key, __prefix + __layer + ':info']
+            __old['mapping-i'].append(__prefix + __layer)
+
+        # Save document and remove previous keys
+        with self.batch():
+            self.get_pipeline('files').set(
+                identifier + ':metadata', encode_metadata(__metadata)
+            )
+            self.register_records(
+                identifier, 'files', [identifier + ':metadata']
+            )
+            for __d in __old:
+                self.get_pipeline(__d).delete(*__old[__d])
+                self.get_pipeline(__d).srem(identifier + ':keys', *__old[__d])
 
-            # Get identifier of layer
-            __layer = layers[__k]
+        return __metadata
 
-            # Iterate over fields
-            for __f in layers_fields[__k]['values']:
+    def migrate_records_metadata(self):
+        """ This function allows to migrate all the tasks
+            saved with the previous keys.
 
-                # Generate value
-                __v = layers_fields[__k]['values'][__f] + \
-                    ' - ' + str(int(layers_fields[__k]['dup'][__f]))
+        Returns:
+            int: number of migrated tasks
 
-                # Save field on database
-                self.redis['mapping-i'].hset(
-                    identifier + ':layer:' + __layer,
-                    __f, __v
-                )
+        """
+
+        # Get tasks with layers saved with previous keys
+        __tasks = set(
+            __k.split(':layer:')[0]
+            for __k in self.redis['files'].scan_iter('*:layer:*:name')
+        )
+
+        return sum(
+            1 for __task in __tasks
+            if self.migrate_record_metadata(__task) is not None
+        )
 
     def save_record_status(self, identifier, database, status):
         """ This function allows to save the status of the task.
@@ -272,9 +576,11 @@ class WorkerRedis(object):
         """
 
         # Save new status on the database
-        self.redis['status'].rpush(
-            identifier, database + ':' + str(status)
-        )
+        with self.batch():
+            self.get_pipeline('status').rpush(
+                identifier, database + ':' + str(status)
+            )
+            self.register_records(identifier, 'status', [identifier])
 
     def save_record_log(self, identifier, kind, messages):
         """ This function allows to save the status of the task.
@@ -297,48 +603,115 @@ class WorkerRedis(object):
         ]
 
         # Save structure
-        for __message in __messages:
-            self.redis['messages'].rpush(
-                identifier + __kind, __message
-            )
+        if len(__messages):
+            with self.batch():
+                self.get_pipeline('messages').rpush(
+                    identifier + __kind, *__messages
+                )
+                self.register_records(
+                    identifier, 'messages', [identifier + __kind]
+                )
 
-    def unlock(self, identifier, forced=False):
-        """ This function allows to remove a Redis lock.
+    def save_record_profile(self, identifier, stages):
+        """ This function allows to save the measures
+            of the stages of the task.
 
         Args:
-            identifier (string): key to unlock
-            forced (bool): flag for unlocking db hardly
-
-        Returns:
-            bool: True if unlock, False otherwise.
+            identifier (string): key where save information
+            stages (list): measures returned from profiler
 
         """
 
-        # Check if lock exists
-        if self.redis['tasks'].exists(identifier):
-        
-            # Check the time of expiration
-            # This behaviour is to be sure that the
-            # worker with the lock is not crashed
-            if (int(self.redis['tasks'].get(identifier)) <
-                    int(time.time())) or forced:
+        with self.batch():
+            __pipe = self.get_pipeline('messages')
 
-                # Release the identifier of the task
-                self.redis['tasks'].delete(identifier)
+            # Remove previous measures
+            __pipe.delete(identifier + '-profile')
 
-                # Unlock was successful
-                return True
+            # Save structure
+            if len(stages):
+                __pipe.rpush(identifier + '-profile', *[
+                    json.dumps(__stage) for __stage in stages
+                ])
+                self.register_records(
+                    identifier, 'messages', [identifier + '-profile']
+                )
 
-        # Unlock was unsuccessful
-        return False
 
-    def lock(self, identifier, database, seconds=21):
-        """ This function allows to create a Redis lock.
+class WorkerLock(object):
+    """ This constructor creates the lease lock of a task. The
+        lock is saved with SET NX PX and a token of the owner,
+        so only the owner can extend or release it. A background
+        heartbeat extends the lease while the task is running and
+        a fencing counter is increased only when the lock is taken
+        (same script) and saved with the token, so the writes of
+        a stale owner are rejected.
 
-        Args:
-            identifier (string): key to lock
-            database (string): identifier of db
-            seconds (int): time to lock
+    Returns:
+        class: Worker Lock
+
+    """
+
+    # Lua scripts to take the lock increasing the fence, to
+    # extend, release and write only if the lock is owned (token
+    # and fence), writes are saved as database, number of
+    # arguments and arguments
+    script_acquire = \
+        "if redis.call('exists', KEYS[1]) == 1 then return 0 end " \
+        "local fence = redis.call('incr', KEYS[2]) " \
+        "redis.call('sadd', KEYS[3], KEYS[2]) " \
+        "redis.call('set', KEYS[1], ARGV[1] .. ':' .. fence, " \
+        "'PX', ARGV[2]) return fence"
+    script_extend = \
+        "if redis.call('get', KEYS[1]) == ARGV[1] then " \
+        "return redis.call('pexpire', KEYS[1], ARGV[2]) end return 0"
+    script_release = \
+        "if redis.call('get', KEYS[1]) == ARGV[1] then " \
+        "return redis.call('del', KEYS[1]) end return 0"
+    script_write = \
+        "if redis.call('get', KEYS[1]) ~= ARGV[1] then return 0 end " \
+        "local i = 2 " \
+        "while i <= #ARGV do " \
+        "redis.call('select', ARGV[i]) " \
+        "local n = tonumber(ARGV[i + 1]) " \
+        "redis.call(unpack(ARGV, i + 2, i + 1 + n)) " \
+        "i = i + 2 + n end return 1"
+
+    # Commands with many values are split before writing them,
+    # unpack of Lua is limited (8000 values), it saves the number
+    # of fixed arguments (name and key) and values per item
+    split_commands = {
+        'DEL': (1, 1), 'SADD': (2, 1), 'SREM': (2, 1),
+        'RPUSH': (2, 1), 'HMSET': (2, 2), 'HSET': (2, 2)
+    }
+    split_size = 4000
+
+    def __init__(self, rd, identifier, mapping):
+
+        # Set keys of the lock and its fence
+        self.rd = rd
+        self.redis = rd.redis['tasks']
+        self.identifier = identifier
+        self.mapping = mapping
+        self.key = identifier + ':' + mapping
+        self.key_fence = self.key + ':fence'
+
+        # Set init values
+        self.token = uuid.uuid4().hex
+        self.fence = None
+        self.value = None
+        self.lease = int(config.redis_worker['lease'] * 1000)
+        self.heartbeat = None
+        self.running = Event()
+
+        # Register scripts
+        self.take = self.redis.register_script(self.script_acquire)
+        self.extend = self.redis.register_script(self.script_extend)
+        self.release_owned = self.redis.register_script(self.script_release)
+        self.write_owned = self.redis.register_script(self.script_write)
+
+    def acquire(self):
+        """ This function allows to take the lock.
 
         Returns:
             int: status returned
@@ -348,42 +721,232 @@ class WorkerRedis(object):
 
         """
 
-        # Create lock flag
-        __lock_status = False
+        # Check if for any reason the task is finished
+        if self.rd.check_existence(self.identifier, self.mapping):
+            return 2
+
+        # Take lock if it does not exist or its lease expired,
+        # the fence is increased (previous owners are stale) and
+        # saved at the registry of the task only if it is taken
+        __fence = self.take(
+            keys=[self.key, self.key_fence, self.identifier + ':keys'],
+            args=[self.token, self.lease]
+        )
+        if not __fence:
+            return 1
+        self.fence = __fence
+        self.value = self.token + ':' + str(__fence)
+        self.rd.lease = self
+
+        # Start heartbeat
+        self.running.set()
+        self.heartbeat = Thread(target=self.extend_lease)
+        self.heartbeat.daemon = True
+        self.heartbeat.start()
+
+        return 0
+
+    def extend_lease(self):
+        """ This function extends the lease at background
+            while the lock is owned (a third of the lease).
+
+        """
+
+        while self.running.is_set():
+            self.running.wait(self.lease / 3000.0)
+            if not self.running.is_set():
+                break
+            try:
+                if not self.extend(
+                    keys=[self.key], args=[self.value, self.lease]
+                ):
+                    break
+            except (ConnectionError, TimeoutError):
+                pass
+
+    def write(self, pipelines):
+        """ This function allows to send the writes of the
+            pipelines only if the lock is owned and no other
+            worker took it later (check and writes are atomic).
+
+        Args:
+            pipelines (dict): Redis pipelines by database
+
+        Returns:
+            bool: True if writes are sent, False otherwise
+
+        """
+
+        # Get arguments of the commands of each database
+        __args = [self.value]
+        for __d in pipelines:
+            __db = config.redis_worker['dbs'].index(__d)
+            for __command, __options in pipelines[__d].command_stack:
+                for __part in self.split_command(list(__command)):
+                    __args += [__db, len(__part)] + __part
+
+        return bool(self.write_owned(keys=[self.key], args=__args))
+
+    def split_command(self, command):
+        """ This function allows to split a command with
+            many values into commands with the same fixed
+            arguments and a part of the values.
+
+        Args:
+            command (list): name and arguments of the command
+
+        Returns:
+            list: commands
+
+        """
+
+        # Check if command must be split
+        __split = self.split_commands.get(str(command[0]).upper())
+        if __split is None or len(command) <= self.split_size:
+            return [command]
+
+        # Split values keeping complete items
+        __fixed, __item = __split
+        __size = self.split_size - self.split_size % __item
+        return [
+            command[:__fixed] + command[__i:__i + __size]
+            for __i in range(__fixed, len(command), __size)
+        ]
+
+    def release(self):
+        """ This function allows to release the lock,
+            only if it is owned.
+
+        """
+
+        # Stop heartbeat
+        self.running.clear()
+        if self.heartbeat is not None:
+            self.heartbeat.join()
+            self.heartbeat = None
+        if self.rd.lease is self:
+            self.rd.lease = None
+
+        # Delete lock
+        if self.value is not None:
+            self.release_owned(keys=[self.key], args=[self.value])
+
+
+class WorkerCheckpoint(object):
+    """ This constructor creates the checkpoint of the stages
+        finished by a task, they are saved at Redis so a retried
+        task can skip them.
+
+    Returns:
+        class: Worker Checkpoint
+
+    """
+
+    def __init__(self, rd, identifier, mapping):
+
+        # Set key of the checkpoint
+        self.rd = rd
+        self.redis = rd.redis['tasks']
+        self.identifier = identifier
+        self.key = identifier + ':' + mapping + ':checkpoint'
+
+        # Get stages finished by previous executions
+        self.stages = {
+            __k: json.loads(__v)
+            for __k, __v in self.redis.hgetall(self.key).items()
+        }
+
+    def get(self, stage):
+        """ This function allows to get the result of a stage.
+
+        Args:
+            stage (string): stage's name
+
+        Returns:
+            object: result of the stage or None
+
+        """
+
+        return self.stages.get(stage)
+
+    def save(self, stage, value):
+        """ This function allows to save the result of a stage.
+
+        Args:
+            stage (string): stage's name
+            value (object): result of the stage (JSON)
 
-        # Create pseudo-identifier
-        __identifier = identifier + ':' + database
+        """
 
-        # Check if lock does not exist
-        if not self.redis['tasks'].exists(__identifier):
-            
-            # Save database to lock
-            self.redis['tasks'].setnx(
-                __identifier, str(int(time.time()) + seconds)
+        self.stages[stage] = value
+        with self.rd.batch():
+            self.rd.get_pipeline('tasks').hset(
+                self.key, stage, json.dumps(value)
             )
+            self.rd.register_records(self.identifier, 'tasks', [self.key])
 
-            # Set new value to flag
-            __lock_status = True
+    def remove(self):
+        """ This function allows to remove all the stages. It
+            is written at the current batch, so the stages are
+            removed with the results of the task.
+        """
 
-        else:
+        self.stages = {}
+        with self.rd.batch():
+            __pipe = self.rd.get_pipeline('tasks')
+            __pipe.delete(self.key)
+            __pipe.srem(self.identifier + ':keys', self.key)
 
-            # Try to unlock
-            if self.unlock(__identifier):
-                
-                # Try to lock again
-                if self.lock(identifier, database) == 0:
 
-                    # Set new value to flag
-                    __lock_status = True
+class WorkerProgress(object):
+    """ This constructor creates the progress of a task. The
+        current stage and its percentage are saved at Redis and
+        published at a channel with the same name of the key,
+        only when they change.
 
-        # Check if for any reason the task is finished
-        if self.check_existence(identifier, database):
+    Returns:
+        class: Worker Progress
+
+    """
 
-            # If task is finished, unlock the resource
-            self.unlock(__identifier, True)
+    def __init__(self, rd, identifier, mapping):
 
-            # Lock must be removed for always
-            return 2
+        # Set key and channel of the progress
+        self.redis = rd.redis['tasks']
+        self.key = identifier + ':' + mapping + ':progress'
+        self.registry = identifier + ':keys'
+
+        # Set init values
+        self.stage = None
+        self.percent = None
+
+    def publish(self, stage, percent):
+        """ This function allows to save and publish the
+            progress of the task.
+
+        Args:
+            stage (string): stage's name
+            percent (int): percentage of the stage
+
+        """
 
-        # Return status depending previous lock
-        return 0 if __lock_status else 1
+        # Check if progress has changed
+        __percent = int(percent)
+        if stage == self.stage and __percent == self.percent:
+            return
+        self.stage = stage
+        self.percent = __percent
+
+        # Save and publish progress
+        __progress = {
+            'stage': stage,
+            'percent': __percent,
+            'time': int(time.time())
+        }
+        # Save it at the registry of the task, so
+        # it is removed with the other records
+        __pipe = self.redis.pipeline(transaction=True)
+        __pipe.hmset(self.key, __progress)
+        __pipe.sadd(self.registry, self.key)
+        __pipe.publish(self.key, json.dumps(__progress))
+        __pipe.execute()
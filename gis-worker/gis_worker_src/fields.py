@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import re
+import sys
+import math
+import struct
+import hashlib
+import settings
+from datetime import date
+
+if sys.version_info < (3, 0):
+    reload(sys)
+    sys.setdefaultencoding('utf8')
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+config = settings.Config()
+
+
+##########################################################################
+
+
+# Kinds of OGR fields that can be inferred
+#   int = 0, int64 (long) = 12,
+#   real (float) = 2, str = 4, date = 9
+ogr_inferred = [0, 12, 2, 9]
+
+# Kinds of numbers, sorted from the narrowest to the widest
+ogr_numbers = [0, 12, 2]
+
+# Classifiers for a whole chunk of values joined
+# by new lines, leading zeros are not numbers
+ogr_classifiers = {
+    0: re.compile(r'(?:[+-]?(?:0|[1-9]\d{0,8})\n)*\Z'),
+    12: re.compile(r'(?:[+-]?(?:0|[1-9]\d{0,17})\n)*\Z'),
+    2: re.compile(
+        r'(?:[+-]?(?:(?:0|[1-9]\d*)(?:\.\d*)?|\.\d+)'
+        r'(?:[eE][+-]?\d+)?\n)*\Z'
+    ),
+    9: re.compile(
+        r'(?:(?:\d{4}[-/.](?:0?[1-9]|1[0-2])[-/.]'
+        r'(?:0?[1-9]|[12]\d|3[01])'
+        r'|(?:0?[1-9]|[12]\d|3[01])[-/.]'
+        r'(?:0?[1-9]|[12]\d|3[01])[-/.]\d{4})'
+        r'(?:[ T]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?'
+        r'(?:Z|[+-]\d{2}:?\d{2})?)?\n)*\Z'
+    )
+}
+
+# Parsers for the date of a single value
+ogr_date_ymd = re.compile(r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})')
+ogr_date_dmy = re.compile(r'(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})')
+
+
+##########################################################################
+
+
+def convert_value(value, kind):
+    """ This function returns the value converted
+        to the inferred kind of its field.
+
+    Args:
+        value (object): original value
+        kind (OGRType): inferred kind
+
+    Returns:
+        object: converted value or None
+
+    """
+
+    try:
+
+        # Check if kind is a Number
+        if kind == 0 or kind == 12:
+            return int(value)
+        elif kind == 2:
+            return float(value)
+
+        # Check if kind is a Date
+        elif kind == 9:
+
+            # Get year, month and day from value,
+            # ambiguous dates are month first
+            __date = ogr_date_ymd.match(value)
+            if __date is not None:
+                __y, __m, __d = __date.groups()
+            else:
+                __date = ogr_date_dmy.match(value)
+                __m, __d, __y = __date.groups()
+                if int(__m) > 12:
+                    __m, __d = __d, __m
+
+            return date(int(__y), int(__m), int(__d)).\
+                strftime('%Y-%m-%d')
+
+        return value
+
+    except (ValueError, AttributeError):
+        return None
+
+
+##########################################################################
+
+
+class HyperLogLog(object):
+    """ This constructor creates a probabilistic counter of
+        distinct values (HyperLogLog). Its memory is fixed
+        by the precision (2 ^ precision registers) and its
+        standard error is 1.04 / sqrt(2 ^ precision).
+
+    Returns:
+        class: HyperLogLog
+
+    """
+
+    def __init__(self, precision):
+
+        # Set registers of the sketch
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+        self.alpha = 0.7213 / (1.0 + 1.079 / self.size)
+        self.error = 1.04 / math.sqrt(self.size)
+
+    def add(self, value):
+        """ This function allows to add a value to the sketch.
+
+        Args:
+            value (object): value to count
+
+        """
+
+        # Get 64 bits hash from value
+        __hash = struct.unpack(
+            '<Q', hashlib.md5(str(value)).digest()[:8]
+        )[0]
+
+        # Get register and rank (first bit set) from hash
+        __index = __hash & (self.size - 1)
+        __rank = 64 - self.precision - \
+            (__hash >> self.precision).bit_length() + 1
+
+        # Save maximum rank for the register
+        if __rank > self.registers[__index]:
+            self.registers[__index] = __rank
+
+    def cardinality(self):
+        """ This function allows to get the estimation
+            of distinct values added to the sketch.
+
+        Returns:
+            int: estimated distinct values
+
+        """
+
+        # Calculate raw estimation
+        __estimation = self.alpha * self.size * self.size / sum(
+            2.0 ** -__r for __r in self.registers
+        )
+
+        # Use linear counting for small cardinalities
+        __zeros = sum(1 for __r in self.registers if __r == 0)
+        if __estimation <= 2.5 * self.size and __zeros:
+            __estimation = self.size * math.log(
+                float(self.size) / __zeros
+            )
+
+        return int(round(__estimation))
+
+
+class FieldProfile(object):
+    """ This constructor creates the profile of a field. The
+        distinct values are saved at a hash set until the cap
+        is reached, then they are counted with a HyperLogLog
+        sketch to keep the memory bounded.
+
+    Returns:
+        class: Field Profile
+
+    """
+
+    def __init__(self, cap=None, precision=None):
+
+        # Set limits of the profile
+        self.cap = config.gis_profile_cap if cap is None else cap
+        self.precision = config.gis_profile_precision \
+            if precision is None else precision
+
+        # Set init values
+        self.values = set()
+        self.sketch = None
+        self.count = 0
+        self.nulls = 0
+        self.duplicated = False
+
+    def add(self, value):
+        """ This function allows to add a value of the field.
+
+        Args:
+            value (object): value of the field
+
+        """
+
+        # Check if value is null
+        if value is None:
+            self.nulls += 1
+            return
+
+        self.count += 1
+
+        # Check if values are being estimated
+        if self.sketch is not None:
+            self.sketch.add(value)
+
+        # Check if value is already inserted
+        elif value in self.values:
+            self.duplicated = True
+
+        else:
+            self.values.add(value)
+
+            # Change to sketch when cap is reached
+            if len(self.values) > self.cap:
+                self.sketch = HyperLogLog(self.precision)
+                for __value in self.values:
+                    self.sketch.add(__value)
+                self.values = None
+
+    def information(self):
+        """ This function allows to get the profile of the field.
+
+        Returns:
+            dict: cardinality, estimated and unique flags
+                and ratio of null values
+
+        """
+
+        # Get distinct values (exact or estimated)
+        if self.sketch is None:
+            __cardinality = len(self.values)
+            __unique = not self.duplicated
+        else:
+            __cardinality = min(self.sketch.cardinality(), self.count)
+            __unique = not self.duplicated and __cardinality >= \
+                self.count * (1.0 - 3 * self.sketch.error)
+
+        # Calculate null values ratio
+        __total = self.count + self.nulls
+        __nulls = float(self.nulls) / __total if __total else 0.0
+
+        return {
+            'cardinality': __cardinality,
+            'estimated': int(self.sketch is not None),
+            'unique': int(__unique),
+            'nulls': round(__nulls, 4)
+        }
+
+
+class FieldKind(object):
+    """ This constructor creates the inference of the kind
+        of a field. The values are classified by chunks with
+        precompiled expressions instead of value by value,
+        and the narrowest kind valid for all of them is kept.
+
+    Returns:
+        class: Field Kind
+
+    """
+
+    def __init__(self, kind, chunk=None):
+
+        # Set original kind and size of chunks
+        self.original = kind
+        self.chunk = config.gis_inference_chunk \
+            if chunk is None else chunk
+
+        # Only strings and int64 can be inferred
+        self.kind = None if kind in [4, 12] else kind
+        self.values = []
+
+    def add(self, value):
+        """ This function allows to add a not null value
+            of the field.
+
+        Args:
+            value (object): value of the field
+
+        """
+
+        # Check if kind is already decided
+        if self.kind == self.original:
+            return
+
+        self.values.append(str(value))
+
+        # Classify values when chunk is full
+        if len(self.values) >= self.chunk:
+            self.classify()
+
+    def classify(self):
+        """ This function allows to classify the pending
+            chunk of values and merge it with previous kind.
+
+        """
+
+        # Check if there are values to classify
+        if not len(self.values):
+            return
+
+        # Join values, new lines inside them are not allowed
+        __chunk = self.values
+        __values = '\n'.join(__chunk) + '\n'
+        __valid = __values.count('\n') == len(__chunk)
+        self.values = []
+
+        # Get candidates from the current kind, numbers
+        # are only extended to wider kinds of numbers
+        __kinds = ogr_inferred if self.kind is None else \
+            ogr_numbers[ogr_numbers.index(self.kind):] \
+            if self.kind in ogr_numbers else [self.kind]
+
+        # Search first kind valid for the whole chunk, dates
+        # must exist (expression accepts 2017-02-30)
+        for __kind in __kinds:
+            if __valid and ogr_classifiers[__kind].match(__values) and (
+                __kind != 9 or all(
+                    convert_value(__v, 9) is not None for __v in __chunk
+                )
+            ):
+                self.kind = __kind
+                return
+
+        # Values have not a common kind (mixed numbers and
+        # dates), so the field keeps its original kind (string)
+        self.kind = self.original
+
+    def result(self):
+        """ This function allows to get the inferred kind.
+
+        Returns:
+            int: OGR kind of the field
+
+        """
+
+        # Classify last chunk
+        if self.kind != self.original:
+            self.classify()
+
+        return self.original if self.kind is None else self.kind
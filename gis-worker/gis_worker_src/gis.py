@@ -14,11 +14,21 @@
 """
 
 import os
+import re
 import sys
+import json
+import time
+import carte
+import fcntl
 import utils
+import shutil
 import settings
+import tempfile
 from datetime import datetime
-from dateutil.parser import parse
+from threading import Thread, Timer
+from billiard import Pool
+from profiler import WorkerProfiler
+from fields import FieldKind, FieldProfile, convert_value
 from subprocess import Popen, PIPE
 
 if sys.version_info < (3, 0):
@@ -42,6 +52,51 @@ config = settings.Config()
 ##########################################################################
 
 
+# Extensions and layer options of the web formats
+ogr_export_extensions = {
+    'GeoJSON': '.geojson',
+    'GeoJSONSeq': '.geojsons',
+    'FlatGeobuf': '.fgb'
+}
+ogr_export_options = {
+    'GeoJSON': [],
+    'GeoJSONSeq': ['RS=NO'],
+    'FlatGeobuf': ['SPATIAL_INDEX=YES']
+}
+
+# Layer creation options of the drivers, the same options are
+# used by ogr2ogr and by the rewriting of validated layers
+ogr_layer_options = {
+    'ESRI Shapefile': ['ENCODING=UTF-8']
+}
+
+# Maximum length of the names of the fields of the drivers
+ogr_field_name_size = {
+    'ESRI Shapefile': 10
+}
+
+# Messages of a process that could not allocate memory
+ogr_memory_errors = re.compile(
+    r'MemoryError|bad_alloc|[Oo]ut of memory|[Cc]annot allocate memory'
+)
+
+# Percentages printed by ogr2ogr -progress (0...10...100 - done.)
+ogr_progress = re.compile(r'(\d+)(?:\.\.\.| - done)')
+
+# Approximate bytes of a distinct value saved at a profile
+ogr_profile_value_size = 128
+
+# Files generated next to a layer from its final files
+ogr_index_extensions = ['.qix']
+
+# Extension of the file with the information of a validated layer,
+# it marks that the layer files are replaced by the validated ones
+ogr_validated_extension = '.validated'
+
+
+##########################################################################
+
+
 def check_geo_has_extent(information):
     """ This function allows you to check if the
         information has good extent
@@ -82,32 +137,69 @@ def cmd_geo(arguments):
         '-level=Detailed', '-norep'
     ]
 
-    # Execute GeoKettle command
-    __g_out, __g_err = exec_command(__arguments)
+    # Execute GeoKettle at the running Carte server
+    if config.xml_engine == 'carte':
+        __slot = acquire_slot()
+        try:
+            __g_out, __g_err, __g_reason = carte.exec_carte(arguments[1])
+        finally:
+            release_slot(__slot)
+
+    # Execute GeoKettle command, the memory of
+    # the JVM is set by its own options (-Xmx)
+    else:
+        __g_out, __g_err, __g_reason = \
+            exec_command(__arguments, memory=False)
+
+    # Add reason if process was stopped
+    __info = parse_geo_return(__g_out, __g_err)
+    if __g_reason is not None:
+        __info['error'].append(__g_reason)
 
-    return parse_geo_return(__g_out, __g_err), __g_out
+    return __info, __g_out
 
 
-def cmd_ogr2ogr(arguments):
+def cmd_ogr2ogr(arguments, progress=None):
     """ This function executes an ogr2ogr command.
 
     Args:
         arguments (list): parameters to execute
+        progress (function): function called with the percentage
 
     Returns:
         triple: parsed output, errors and exit code.
 
     """
 
+    # Execute GDAL library if it is configured
+    if config.gis_engine == 'library':
+        __g_out, __g_err = exec_library(
+            lib_ogr2ogr, arguments + [progress], True
+        )
+        return parse_ogr_return(__g_out, __g_err)
+
     # Extend arguments with ogr executable
     __arguments = [
         'ogr2ogr', '-t_srs', 'EPSG:4326', '-f'
     ] + arguments + ['-explodecollections']
 
+    # Add layer creation options of the driver
+    for __option in ogr_layer_options.get(arguments[0], []):
+        __arguments += ['-lco', __option]
+
+    # Print percentage if progress is followed
+    if progress is not None:
+        __arguments.append('-progress')
+
     # Execute GDAL commands
-    __g_out, __g_err = exec_command(__arguments)
+    __g_out, __g_err, __g_reason = exec_command(__arguments, progress)
 
-    return parse_ogr_return(__g_out, __g_err)
+    # Add reason if process was stopped
+    __info = parse_ogr_return(__g_out, __g_err)
+    if __g_reason is not None:
+        __info['error'].append(__g_reason)
+
+    return __info
 
 
 def cmd_ogrinfo(arguments):
@@ -121,34 +213,413 @@ def cmd_ogrinfo(arguments):
 
     """
 
+    # Execute GDAL library if it is configured
+    if config.gis_engine == 'library':
+        __g_out, __g_err = exec_library(lib_ogrinfo, arguments, True)
+        return parse_ogr_return(__g_out, __g_err)
+
     # Extend arguments with ogr executable
     __arguments = ['ogrinfo', '-al', '-so'] + arguments
 
     # Execute GDAL commands
-    __g_out, __g_err = exec_command(__arguments)
-    
-    return parse_ogr_return(__g_out, __g_err)
+    __g_out, __g_err, __g_reason = exec_command(__arguments)
+
+    # Add reason if process was stopped
+    __info = parse_ogr_return(__g_out, __g_err)
+    if __g_reason is not None:
+        __info['error'].append(__g_reason)
+
+    return __info
 
 
-def exec_command(arguments):
+def acquire_slot():
+    """ This function waits for a free slot of the host to
+        execute a process. Slots are files locked with flock,
+        so they are shared by all the worker processes and
+        released by the system if a worker dies.
+
+    Returns:
+        file: locked slot or None if slots are disabled
+
+    """
+
+    # Check if slots are enabled
+    if not config.gis_slots:
+        return None
+
+    # Create folder of the slots
+    __folder = config.gis_slots_folder or \
+        os.path.join(tempfile.gettempdir(), 'gis-worker-slots')
+    if not os.path.isdir(__folder):
+        try:
+            os.makedirs(__folder)
+        except OSError:
+            pass
+
+    # Try to lock any slot until one is free
+    while True:
+        for __n in range(0, config.gis_slots):
+            __slot = open(os.path.join(__folder, str(__n)), 'a')
+            try:
+                fcntl.flock(__slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return __slot
+            except IOError:
+                __slot.close()
+        time.sleep(0.25)
+
+
+def release_slot(slot):
+    """ This function releases a slot of the host.
+
+    Args:
+        slot (file): locked slot or None
+
+    """
+
+    if slot is not None:
+        fcntl.flock(slot, fcntl.LOCK_UN)
+        slot.close()
+
+
+def limit_process(arguments):
+    """ This function returns the arguments to execute a
+        command with its memory (address space) limited. The
+        limit is set by the shell before executing the command,
+        so nothing runs at the forked worker process (it
+        could have other threads running).
+
+    Args:
+        arguments (list): parameters to execute
+
+    Returns:
+        list: parameters to execute with the limit
+
+    """
+
+    return [
+        '/bin/sh', '-c', 'ulimit -v ' +
+        str(config.gis_process_memory * 1024) + ' && exec "$@"', 'sh'
+    ] + arguments
+
+
+def exec_command(arguments, progress=None, memory=True):
     """ This function executes an ogr command through
-        subprocess.
+        subprocess. The process waits for a free slot of the
+        host, it is stopped when the time limit is reached and
+        its memory is limited. If progress is set, the output
+        is read while the process is running and the last
+        percentage printed (-progress option) is sent to progress.
+
+    Args:
+        arguments (list): parameters to execute
+        progress (function): function called with the percentage
+        memory (bool): flag to limit the memory of the process
+
+    Returns:
+        triple: output, errors and reason if process was stopped.
+
+    """
+
+    # Check if memory must be limited
+    __memory = memory and config.gis_process_memory > 0
+
+    # Wait for a free slot of the host
+    __slot = acquire_slot()
+
+    try:
+
+        # Create process
+        __proc = Popen(
+            limit_process(arguments) if __memory else arguments,
+            stdout=PIPE, stderr=PIPE
+        )
+
+        # Stop process when time limit is reached
+        __timeout = []
+        __timer = None
+        if config.gis_timeout > 0:
+
+            def kill_process():
+                __timeout.append(True)
+                try:
+                    __proc.kill()
+                except OSError:
+                    pass
+
+            __timer = Timer(config.gis_timeout, kill_process)
+            __timer.daemon = True
+            __timer.start()
+
+        try:
+
+            # Execute process
+            if progress is None:
+                __proc_out, __proc_err = __proc.communicate()
+
+            else:
+
+                # Read errors at other thread, so process
+                # is not blocked when its buffer is full
+                __proc_err = []
+                __thread = Thread(
+                    target=lambda: __proc_err.append(__proc.stderr.read())
+                )
+                __thread.daemon = True
+                __thread.start()
+
+                # Read output while process is running, the end of
+                # previous block is kept for split percentages
+                __proc_out = []
+                __tail = ''
+                __block = os.read(__proc.stdout.fileno(), 4096)
+                while __block:
+                    __proc_out.append(__block)
+                    __percents = ogr_progress.findall(__tail + __block)
+                    if len(__percents):
+                        progress(min(100, int(__percents[-1])))
+                    __tail = __block[-8:]
+                    __block = os.read(__proc.stdout.fileno(), 4096)
+
+                # Wait for process and errors
+                __proc.wait()
+                __thread.join()
+                __proc_out = ''.join(__proc_out)
+                __proc_err = ''.join(__proc_err)
+
+        finally:
+            if __timer is not None:
+                __timer.cancel()
+
+    finally:
+
+        # Release slot of the host
+        release_slot(__slot)
+
+    # Get reason if process was stopped, a process over its
+    # memory limit fails to allocate memory (it is not killed)
+    __reason = None
+    if len(__timeout):
+        __reason = 'The process ' + os.path.basename(arguments[0]) + \
+            ' was stopped after ' + str(config.gis_timeout) + \
+            ' seconds (time limit).'
+    elif __proc.returncode < 0:
+        __reason = 'The process ' + os.path.basename(arguments[0]) + \
+            ' was killed by signal ' + str(-__proc.returncode) + '.'
+    elif __proc.returncode > 0 and __memory and \
+            ogr_memory_errors.search(__proc_err):
+        __reason = 'The process ' + os.path.basename(arguments[0]) + \
+            ' exceeded the memory limit of ' + \
+            str(config.gis_process_memory) + ' MB.'
+
+    return __proc_out, __proc_err, __reason
+
+
+def exec_library(function, arguments, slot=False):
+    """ This function executes an ogr operation through
+        the GDAL python bindings. The messages raised by
+        GDAL are captured with the same format of the
+        command line tools. The operation runs at the worker
+        process, so it waits for a free slot of the host if
+        slot is set, but the time and memory limits of the
+        processes (timeout, process_memory) are not applied.
 
     Args:
+        function (function): operation to execute
         arguments (list): parameters to execute
+        slot (bool): flag to wait for a free slot of the host
 
     Returns:
-        triple: output, errors and exit code of the process.
+        tuple: output and errors of the operation.
 
     """
 
-    # Create process
-    __proc = Popen(arguments, stdout=PIPE, stderr=PIPE)
+    from osgeo import gdal
+
+    # Create structure for captured messages
+    __errors = []
+
+    def error_handler(err_class, err_no, err_msg):
+        if err_class == gdal.CE_Warning:
+            __kind = 'Warning '
+        elif err_class in [gdal.CE_Failure, gdal.CE_Fatal]:
+            __kind = 'ERROR '
+        else:
+            return
+        __errors.append(
+            __kind + str(err_no) + ': ' +
+            str(err_msg).replace('\n', ' ')
+        )
+
+    # Wait for a free slot of the host
+    __slot = acquire_slot() if slot else None
+
+    # Capture messages while operation is executed
+    gdal.PushErrorHandler(error_handler)
+    try:
+        __output = function(arguments)
+    except Exception as e:
+        __output = ''
+        error_handler(gdal.CE_Failure, 1, str(e))
+    finally:
+        gdal.PopErrorHandler()
+        release_slot(__slot)
+
+    return __output, '\n'.join(__errors + [''])
+
+
+def lib_ogr2ogr(arguments):
+    """ This function executes the same transformation
+        of ogr2ogr command through GDAL python bindings.
+
+    Args:
+        arguments (list): driver, destination, source
+            and optional function called with the percentage
+
+    Returns:
+        string: output of the transformation.
+
+    """
+
+    from osgeo import gdal
+
+    # Get function to follow the progress
+    __progress = arguments[3] if len(arguments) > 3 else None
 
-    # Execute process
-    __proc_out, __proc_err = __proc.communicate()
+    def progress_handler(complete, message, data):
+        __progress(int(complete * 100))
+        return 1
+
+    # Open source file as vector data
+    __src = gdal.OpenEx(arguments[2], gdal.OF_VECTOR)
+
+    # Check if source was opened
+    if __src is None:
+        gdal.Error(
+            gdal.CE_Failure, 4, 'Unable to open datasource `' +
+            arguments[2] + '\' with the following drivers.'
+        )
+        return ''
+
+    # Execute transformation with the same options
+    __dst = gdal.VectorTranslate(
+        arguments[1], __src, options=gdal.VectorTranslateOptions(
+            format=arguments[0], dstSRS='EPSG:4326',
+            layerCreationOptions=ogr_layer_options.get(arguments[0], []),
+            explodeCollections=True, callback=None
+            if __progress is None else progress_handler
+        )
+    )
+
+    # Close files to flush them to disk
+    __dst = None
+    __src = None
+
+    return ''
+
+
+def lib_ogrinfo(arguments):
+    """ This function generates the same summary of
+        ogrinfo command through GDAL python bindings.
+
+    Args:
+        arguments (list): parameters to execute
+
+    Returns:
+        string: output of the summary.
+
+    """
+
+    from osgeo import gdal, ogr
+
+    # Open source file as vector data
+    __src = gdal.OpenEx(arguments[0], gdal.OF_VECTOR)
+
+    # Check if source was opened
+    if __src is None:
+        gdal.Error(
+            gdal.CE_Failure, 4, 'Unable to open datasource `' +
+            arguments[0] + '\' with the following drivers.'
+        )
+        return ''
+
+    # Create structure for output
+    __output = []
+
+    # Iterate over layers
+    for __index in range(0, __src.GetLayerCount()):
+
+        # Get layer and its definition
+        __layer = __src.GetLayerByIndex(__index)
+        __layer_def = __layer.GetLayerDefn()
+
+        # Save layer summary
+        __output += [
+            '',
+            'Layer name: ' + __layer.GetName(),
+            'Geometry: ' + ogr.GeometryTypeToName(__layer.GetGeomType()),
+            'Feature Count: ' + str(__layer.GetFeatureCount())
+        ]
+
+        # Save layer extent if it is available
+        __extent = __layer.GetExtent(can_return_null=True)
+        if __extent is not None:
+            __output.append(
+                'Extent: ' + get_ogr_extent_message(__extent)
+            )
+
+        # Save fields summary
+        for __field in range(0, __layer_def.GetFieldCount()):
+            __output.append(get_ogr_field_message(
+                __layer_def.GetFieldDefn(__field)
+            ))
+
+    # Close file
+    __src = None
 
-    return __proc_out, __proc_err
+    return '\n'.join(__output + [''])
+
+
+def get_ogr_extent_message(extent):
+    """ This function allows to get the extent
+        with the same format of ogrinfo.
+
+    Args:
+        extent (tuple): min x, max x, min y and max y
+
+    Returns:
+        string: bounding box info.
+
+    """
+
+    return '(%f, %f) - (%f, %f)' % (
+        extent[0], extent[2], extent[1], extent[3]
+    )
+
+
+def get_ogr_field_message(field):
+    """ This function allows to get the field
+        with the same format of ogrinfo.
+
+    Args:
+        field (FieldDefn): definition of the field
+
+    Returns:
+        string: field info.
+
+    """
+
+    from osgeo import ogr
+
+    # Get name of the kind of field
+    __field_type = field.GetTypeName()
+    if field.GetSubType() != ogr.OFSTNone:
+        __field_type += '(' + ogr.GetFieldSubTypeName(
+            field.GetSubType()
+        ) + ')'
+
+    return field.GetNameRef() + ': ' + __field_type + \
+        ' (' + str(field.GetWidth()) + '.' + \
+        str(field.GetPrecision()) + ')'
 
 
 def get_ogr_driver(extension):
@@ -188,159 +659,96 @@ def get_ogr_file_extensions(extension):
     return []
 
 
-def parse_ogr_value(value, kind):
-    """ This function returns the parsed value
-        from specific ogr data.
-
-        types => int = 0,
-            int64 (long) = 12,
-            real (float) = 2,
-            str = 4,
-            date = 9
+def get_ogr_field_type(kind):
+    """ This function returns the name of the kind
+        of field used at fields' information.
 
     Args:
-        value (string): value to check
-        kind (OGRType): kind to check
+        kind (string): name of OGR type
 
     Returns:
-        dict: parsed information
+        string: name of the kind
 
     """
 
-    def parse_ogr_number(number):
-        if type(number) == float:
-            return {'value': number, 'ogr': 2}
-        elif type(number) == long:
-            return {'value': number, 'ogr': 12}
-        else:
-            return {'value': number, 'ogr': 0}
+    # Get lower name of the kind
+    __kind = str(kind).lower()
 
-    # Check if data is a String
-    if kind == 4:
+    # Check field info
+    if __kind == 'real':
+        return 'float'
+    elif __kind == 'integer64':
+        return 'long'
 
-        # Deep copy
-        try:
-            __value = str(value)
-        except Exception:
-            __value = '' + value
+    return __kind
 
-        # Check possible date
-        try:
-            __value = parse(__value)
-            if len(value) >= 8 and __value is not None:
-                return {
-                    'value': __value.strftime('%Y-%m-%d'),
-                    'ogr': 9
-                }
-        except Exception:
-            pass
 
-        # Check possible number
-        try:
-            return parse_ogr_number(eval(value))
-        except Exception:
-            return {'value': value, 'ogr': 4}
-
-    # Check if data is a Date
-    elif kind == 9:
-        return {'value': value, 'ogr': 9}
-
-    # data must be a Number
-    else:
-        return parse_ogr_number(value)
-
-
-def extend_ogr_fields(path, fields):
-    """ This function checks the fields
-        of specific Geo-spatial file.
+def get_ogr_projection(layer):
+    """ This function gets gis projections
+        of specific OGR layer.
 
     Args:
-        path (string): file's path
-        fields (dict): fields' information
+        layer (Layer): OGR layer
 
     Returns:
-        dict: extended info of fields
+        string: OGR projection
 
     """
 
-    # Get information from path
-    __path = utils.parse_path(path)
-
-    # Get kind of file depending on final extension
-    __driver = get_ogr_driver(__path['extension'])
-
-    # Get names of fields
-    __fields = fields.keys()
-
-    # Create structure for values
-    __fields_values = {}
-
-    # Get layer from OGR Tools to check if
-    # there is any field is null or empty, so
-    # must be deleted, this file is opened as
-    # DataSource Read-Write (1)
-    from osgeo import ogr
-    __file = ogr.GetDriverByName(__driver)
-    __file_src = __file.Open(path, 1)
-    __file_layer = __file_src.GetLayer()
-
-    # Iterate over features of the layer
-    __file_feat = __file_layer.GetNextFeature()
-
-    while __file_feat is not None:
+    # Get Spatial reference
+    __layer_spatial = layer.GetSpatialRef()
 
-        # Iterate over fields
-        for __field in __fields:
+    # Check if spatial reference exists
+    if __layer_spatial is None:
+        return None
 
-            # Check if field info is saved (first time)
-            if __field not in __fields_values:
-                __fields_values[__field] = {
-                    'd': False, 'v': []
-                }
+    # Detect GIS kind of data
+    __f_cs = 'GEOGCS' if __layer_spatial.IsGeographic() == 1 else 'PROJCS'
+    __f_an = __layer_spatial.GetAuthorityName(__f_cs)
+    __f_ac = __layer_spatial.GetAuthorityCode(__f_cs)
 
-            # Check if field is marked as duplicate
-            if __fields_values[__field]['d']:
-                continue
+    # Detect if name and code are valid
+    return str(__f_an) + ':' + str(__f_ac) \
+        if __f_an is not None and __f_ac is not None else None
 
-            # Get real index
-            __index = __file_feat.GetFieldIndex(__field)
 
-            # Get value from field
-            __value = __file_feat.GetField(__index)
+def get_ogr_profile_cap(fields):
+    """ This function returns the distinct values saved
+        per field so the profiles of all the fields of a
+        layer fit at the memory budget.
 
-            # Check if value is already inserted
-            if __value in __fields_values[__field]['v']:
-                __fields_values[__field]['d'] = True
-                continue
-            else:
-                __fields_values[__field]['v'].append(__value)
+    Args:
+        fields (int): number of fields of the layer
 
-        # Go to Next feature
-        __file_feat = __file_layer.GetNextFeature()
+    Returns:
+        int: distinct values saved per field
 
-    # Close file
-    __file_src = None
+    """
 
-    # Remove values to clean memory
-    # and re-structure dictionary
-    for __field in __fields_values.keys():
-        del __fields_values[__field]['v']
-        __fields_values[__field] = \
-            __fields_values[__field]['d']
+    # Check if memory is not bounded
+    if not config.gis_memory or not fields:
+        return config.gis_profile_cap
 
-    return __fields_values
+    return max(1, min(
+        config.gis_profile_cap, config.gis_memory * 1048576 /
+        (fields * ogr_profile_value_size)
+    ))
 
 
-def validate_ogr_fields(path, fields):
-    """ This function checks the fields
-        of specific Geo-spatial file.
+def analyze_ogr_layer(path):
+    """ This function analyzes the layer of specific
+        Geo-spatial file with a single pass over its
+        features. It gathers the features to be removed,
+        the kind, number of filled values and profile of
+        the fields, the extent, the projection and counters.
+        Values are not saved, so memory does not depend
+        on the number of features.
 
     Args:
         path (string): file's path
-        fields (list): fields' information
 
     Returns:
-        list: removed bad or empty fields.
+        dict: analysis of the layer or None
 
     """
 
@@ -350,22 +758,43 @@ def validate_ogr_fields(path, fields):
     # Get kind of file depending on final extension
     __driver = get_ogr_driver(__path['extension'])
 
-    # Create data structure for checking fields
-    __fields_flags = {}
-
-    # Get layer from OGR Tools to check if
-    # there is any field is null or empty, so
-    # must be deleted, this file is opened as
-    # DataSource Read-Write (1)
-    from osgeo import ogr
+    # Get layer from OGR Tools, this file is
+    # opened as DataSource Read-Only (0)
+    from osgeo import gdal, ogr
     __file = ogr.GetDriverByName(__driver)
-    __file_src = __file.Open(path, 1)
+    __file_src = __file.Open(path, 0)
+
+    # Check if file was opened
+    if __file_src is None:
+        gdal.Error(
+            gdal.CE_Failure, 4, 'Unable to open datasource `' +
+            path + '\' with the following drivers.'
+        )
+        return None
+
     __file_layer = __file_src.GetLayer()
     __file_layer_def = __file_layer.GetLayerDefn()
 
+    # Get distinct values saved per field
+    __profile_cap = get_ogr_profile_cap(__file_layer_def.GetFieldCount())
+
+    # Create data structure for checking fields
+    __fields = []
+    __fields_flags = {}
+    for __index in range(0, __file_layer_def.GetFieldCount()):
+        __field_def = __file_layer_def.GetFieldDefn(__index)
+        __field = __field_def.GetNameRef()
+        __fields.append(__field)
+        __fields_flags[__field] = {
+            'i': __index, 'k': __field_def.GetType(),
+            'n': 0, 'p': FieldProfile(__profile_cap),
+            'c': FieldKind(__field_def.GetType())
+        }
+
     # Create structure for remove features
     __file_feat_rem = []
     __file_feat_count = 0
+    __file_extent = None
 
     # Iterate over features of the layer
     __file_feat = __file_layer.GetNextFeature()
@@ -388,159 +817,401 @@ def validate_ogr_fields(path, fields):
             __file_feat = __file_layer.GetNextFeature()
             continue
 
-        # Iterate over fields of the Shapefile
-        for __field in fields:
+        # Update extent with the geometry
+        __feat_extent = __file_feat_geo.GetEnvelope()
+        __file_extent = __feat_extent if __file_extent is None else (
+            min(__file_extent[0], __feat_extent[0]),
+            max(__file_extent[1], __feat_extent[1]),
+            min(__file_extent[2], __feat_extent[2]),
+            max(__file_extent[3], __feat_extent[3])
+        )
 
-            # Check if field info is saved (first time)
-            if __field not in __fields_flags:
-                __fields_flags[__field] = {'v': {}}
+        # Iterate over fields of the layer
+        for __field in __fields:
 
-            # Get real index
-            __index = __file_feat.GetFieldIndex(__field)
-            __fields_flags[__field]['i'] = __index
+            # Get field info
+            __field_f = __fields_flags[__field]
 
             # Only these types are allowed on Shapefiles
             # int = 0, int64 (double) = 12, real (float) = 2
             # str = 4 and date = 9
 
             # Get original value from field
-            __field_v = __file_feat.GetField(__index)
+            __field_v = __file_feat.GetField(__field_f['i'])
+
+            # Save value to profile
+            __field_f['p'].add(__field_v)
 
             # Check if original value is valid
             if __field_v is not None:
 
-                # Get original kind of field
-                __field_k = __file_feat.GetFieldType(__index)
+                # Count filled value
+                __field_f['n'] += 1
 
-                # Parse value and kind to verify them
-                __field_info = parse_ogr_value(__field_v, __field_k)
+                # Save value to infer the kind by chunks
+                __field_f['c'].add(__field_v)
 
-                # Save value to dictionary
-                __fields_flags[__field]['v'][__file_feat_id] = \
-                    __field_info['value']
+        # Go to Next feature
+        __file_feat = __file_layer.GetNextFeature()
 
-                # Check if real and ogr types are different
-                if __field_k != __field_info['ogr']:
+    # Create kinds and profiles of fields
+    for __field in __fields:
+
+        # Get field info
+        __field_f = __fields_flags[__field]
+
+        # Get inferred kind of the field
+        __field_k = __field_f['c'].result()
+        __field_f['c'] = None
+
+        # Save kind if real and ogr types are different, values
+        # are converted and profiled again when file is written
+        if __field_k != __field_f['k']:
+            __field_f['t'] = __field_k
+
+        __field_f['p'] = __field_f['p'].information()
+
+    # Create structure for analysis
+    __analysis = {
+        'fields': __fields,
+        'fields_flags': __fields_flags,
+        'features': __file_feat_count,
+        'features_removed': __file_feat_rem,
+        'count': __file_feat_count - len(__file_feat_rem),
+        'profile_cap': __profile_cap,
+        'geometry': ogr.GeometryTypeToName(__file_layer.GetGeomType()),
+        'bounding': get_ogr_extent_message(
+            __file_extent if __file_extent is not None
+            else (0.0, 0.0, 0.0, 0.0)
+        ),
+        'crs': get_ogr_projection(__file_layer)
+    }
 
-                    # Check if column has more than one type
-                    if 't' in __fields_flags[__field]:
-                        if __fields_flags[__field]['t'] == 'invalid':
-                            continue
-                        elif __fields_flags[__field]['t'] != \
-                                __field_info['ogr']:
-                            __fields_flags[__field]['t'] = 'invalid'
-                            continue
-                    else:
-                        __fields_flags[__field]['t'] = __field_info['ogr']
+    # Close file
+    __file_src = None
 
-        # Go to Next feature
-        __file_feat = __file_layer.GetNextFeature()
+    return __analysis
 
-    # Reset pointer
-    __file_layer.ResetReading()
 
-    # Remove features without geometry
-    for __file_feat in __file_feat_rem:
-        __file_layer.DeleteFeature(__file_feat)
+def validate_ogr_fields(path, analysis, export=None):
+    """ This function applies the analysis of a layer
+        to specific Geo-spatial file. The final schema is
+        calculated once (removed, renamed and retyped fields
+        and centroids) and the valid features are written
+        with only one pass to a new file that replaces
+        the original one. The same features are written
+        to the web format if export path is set.
 
-    # Set structures for removing fields
-    __sorted_fields = [
-        __f[0] for __f in sorted(
-            __fields_flags.items(),
-            key=lambda x: x[1]['i']
-        )
-    ]
+    Args:
+        path (string): file's path
+        analysis (dict): information from analyze_ogr_layer
+        export (string): web format file's path
+
+    Returns:
+        tuple: removed bad or empty fields and
+            information about the final fields.
+
+    """
+
+    # Get information from path
+    __path = utils.parse_path(path)
+
+    # Get kind of file depending on final extension
+    __driver = get_ogr_driver(__path['extension'])
+
+    # Get fields from analysis
+    __sorted_fields = analysis['fields']
+    __fields_flags = analysis['fields_flags']
 
     # Create structure for empty fields
     __rem_fields = []
 
-    # Iterate and rebuild fields
-    for __field in __sorted_fields:
+    # Create structure for final schema, it saves the
+    # final name, kind, original field and profile
+    __schema = []
+
+    # Create structure for profiles of final fields by their
+    # index, the driver could change the names of the fields
+    __profile_fields = {}
 
-        # Index of the field
-        __index = __file_layer.FindFieldIndex(__field, 1)
+    # Get maximum length of the names of the fields
+    __name_size = ogr_field_name_size.get(__driver)
+
+    # Create structure for names already used, the
+    # names of centroids are reserved
+    __names = set(['geometry_x', 'geometry_y', 'geometry'])
+
+    # Iterate and calculate final fields
+    for __field in __sorted_fields:
 
         # Calculate filled values
-        __filled = float(len(__fields_flags[__field]['v'])) / \
-            float(__file_feat_count)
+        __filled = float(__fields_flags[__field]['n']) / \
+            float(analysis['features'])
 
         # Remove empty fields or less 1% filled
-        if len(__fields_flags[__field]['v']) == 0 or __filled < 0.01:
-            __file_layer.DeleteField(__index)
+        if __fields_flags[__field]['n'] == 0 or __filled < 0.01:
             __rem_fields.append(__field)
+            continue
 
-        # Rename or change type of column
-        else:
+        # Generate cleaned field's name, names without any valid
+        # character are renamed and long names are truncated
+        __field_n = utils.clean_string(__field).encode('utf-8')
+        __field_n = (__field_n or 'field')[:__name_size]
+
+        # Check if name is authorized and not used by
+        # other field (original or already renamed)
+        if __field_n in __names:
+            __n = 0
+            __field_b = __field_n
+            while __field_n in __names or __field_n in __sorted_fields:
+                __field_n = __field_b[:__name_size - len(str(__n))] \
+                    if __name_size else __field_b
+                __field_n += str(__n)
+                __n += 1
+        __names.add(__field_n)
+
+        # Save field to final schema
+        __schema.append((
+            __field_n, __fields_flags[__field].get('t'), __field,
+            __fields_flags[__field]['p']
+        ))
+
+    # Generate centroid if is a Polygon or Multi Polygon
+    __centroids = 'Polygon' in analysis['geometry']
+
+    # Check if file must be written again
+    __rewrite = __centroids or len(__rem_fields) or \
+        len(analysis['features_removed']) or any(
+            __f[1] is not None or __f[0] != __f[2] for __f in __schema
+        )
 
-            # Generate cleaned field's name
-            __field_n = utils.clean_string(__field).encode('utf-8')
-            
-            # Check if name is authorized
-            if __field_n == 'geometry_c' or __field_n == 'geometry':
-                __n = 0
-                __field_n = __field_n[:-2] + str(__n)
-                while __field_n in __sorted_fields:
-                    __field_n = __field_n[:-1] + str(__n)
-                    __n += 1
-
-            # Check if field needs to be renamed
-            if 't' not in __fields_flags[__field] or (
-                't' in __fields_flags[__field] and
-                __fields_flags[__field]['t'] == 'invalid'
-            ):
-
-                # Clean name of the field
-                __file_field = __file_layer_def.GetFieldDefn(__index)
+    # Get layer from OGR Tools, this file is
+    # opened as DataSource Read-Only (0)
+    from osgeo import ogr
+    __file = ogr.GetDriverByName(__driver)
+    __file_src = __file.Open(path, 0)
+    __file_layer = __file_src.GetLayer()
+    __file_layer_def = __file_layer.GetLayerDefn()
 
-                # Change name if it is necessary
-                if __field_n != __field:
-                    __file_field.SetName(__field_n)
-                    __file_layer.AlterFieldDefn(
-                        __index, __file_field,
-                        ogr.ALTER_NAME_FLAG
-                    )
+    # Save profiles of fields of the original file
+    if not __rewrite:
+        for __field_n, __field_t, __field, __field_p in __schema:
+            __profile_fields[
+                __file_layer_def.GetFieldIndex(__field)
+            ] = __field_p
+
+    # Write new file with final schema
+    if __rewrite:
+
+        # Create new file at temporal folder
+        __tmp_folder = __path['folder'] + '.' + __path['name']
+        if os.path.isdir(__tmp_folder):
+            shutil.rmtree(__tmp_folder)
+        __tmp_src = __file.CreateDataSource(__tmp_folder)
+        __tmp_folder += os.sep
+        __tmp_layer = __tmp_src.CreateLayer(
+            __path['name'], __file_layer.GetSpatialRef(),
+            __file_layer.GetGeomType(), ogr_layer_options.get(__driver, [])
+        )
 
-            else:
+        # Create structure for mapping original fields
+        __tmp_map = [-1] * __file_layer_def.GetFieldCount()
+
+        # Create structure for fields with new type
+        __new_fields = []
 
-                # Remove old field
-                __file_layer.DeleteField(__index)
+        # Create fields of final schema
+        for __field_n, __field_t, __field, __field_p in __schema:
 
-                # Create new field
-                __file_layer.CreateField(ogr.FieldDefn(
-                    __field_n, __fields_flags[__field]['t']
+            # Get original field definition
+            __index = __file_layer_def.GetFieldIndex(__field)
+
+            # Check if field has new type, values are
+            # read again and converted when file is written
+            if __field_t is not None:
+                __tmp_layer.CreateField(ogr.FieldDefn(__field_n, __field_t))
+                __new_fields.append((
+                    __tmp_layer.GetLayerDefn().GetFieldCount() - 1,
+                    __index, __field_t, __field_n,
+                    FieldProfile(analysis['profile_cap'])
                 ))
 
-                # Index of the new field
-                __index = __file_layer.FindFieldIndex(__field_n, 1)
+            # Copy field with final name
+            else:
+                __file_field = __file_layer_def.GetFieldDefn(__index)
+                __tmp_field = ogr.FieldDefn(
+                    __field_n, __file_field.GetType()
+                )
+                __tmp_field.SetSubType(__file_field.GetSubType())
+                __tmp_field.SetWidth(__file_field.GetWidth())
+                __tmp_field.SetPrecision(__file_field.GetPrecision())
+                __tmp_layer.CreateField(__tmp_field)
+                __tmp_map[__index] = \
+                    __tmp_layer.GetLayerDefn().GetFieldCount() - 1
+                __profile_fields[__tmp_map[__index]] = __field_p
+
+        # Add centroid fields (longitude and latitude) to layer
+        if __centroids:
+            __centroids_surface = config.gis_centroid == 'surface'
+            __centroids_index = []
+            __centroids_profile = []
+            for __field_n in ['geometry_x', 'geometry_y']:
+                __tmp_field = ogr.FieldDefn(__field_n, ogr.OFTReal)
+                __tmp_field.SetWidth(24)
+                __tmp_field.SetPrecision(15)
+                __tmp_layer.CreateField(__tmp_field)
+                __centroids_index.append(
+                    __tmp_layer.GetLayerDefn().GetFieldCount() - 1
+                )
+                __centroids_profile.append(FieldProfile())
+
+        # Create web format file with final schema
+        if export is not None:
+            __export_src, __export_layer = \
+                create_ogr_export(export, __tmp_layer)
+            __export_layer_def = __export_layer.GetLayerDefn()
+
+        # Get features to be removed
+        __file_feat_rem = set(analysis['features_removed'])
+
+        # Iterate over features of the layer
+        __tmp_layer_def = __tmp_layer.GetLayerDefn()
+        __file_feat = __file_layer.GetNextFeature()
+        while __file_feat is not None:
+
+            # Get Feature internal ID
+            __file_feat_id = __file_feat.GetFID()
+
+            # Check if feature has valid geometry
+            if __file_feat_id not in __file_feat_rem:
+
+                # Copy geometry and not changed fields
+                __tmp_feat = ogr.Feature(__tmp_layer_def)
+                __tmp_feat.SetFromWithMap(__file_feat, 1, __tmp_map)
 
-                # Iterate over features of the layer
-                __file_feat = __file_layer.GetNextFeature()
-                while __file_feat is not None:
+                # Iterate over fields with new type
+                for __index, __file_index, __field_t, __field_n, \
+                        __field_p in __new_fields:
 
-                    # Get Feature internal ID
-                    __file_feat_id = __file_feat.GetFID()
+                    # Get converted value
+                    __value = __file_feat.GetField(__file_index)
+                    if __value is not None:
+                        __value = convert_value(__value, __field_t)
 
-                    # Check if there is a saved value
-                    if __file_feat_id in __fields_flags[__field]['v']:
+                    # Save value to profile
+                    __field_p.add(__value)
 
-                        # Set value to feature
-                        __file_feat.SetField(
-                            __index, __fields_flags[__field]['v'][__file_feat_id]
+                    # Check if there is a converted value
+                    if __value is not None:
+                        __tmp_feat.SetField(__index, __value)
+
+                # Check if centroid must be generated
+                if __centroids:
+
+                    # Get Centroid or point on surface coordinates
+                    __file_geom = __file_feat.GetGeometryRef()
+                    __file_cent = __file_geom.PointOnSurface() \
+                        if __centroids_surface else __file_geom.Centroid()
+                    __file_cent = __file_cent.GetPoint_2D(0)
+
+                    # Save values at new fields and profiles
+                    for __i in range(0, 2):
+                        __centroids_profile[__i].add(__file_cent[__i])
+                        __tmp_feat.SetField(
+                            __centroids_index[__i], __file_cent[__i]
                         )
 
-                    # Go to Next feature
-                    __file_layer.SetFeature(__file_feat)
-                    __file_feat = __file_layer.GetNextFeature()
+                # Write feature at new file
+                __tmp_layer.CreateFeature(__tmp_feat)
 
-                # Reset pointer
-                __file_layer.ResetReading()
+                # Write feature at web format file
+                if export is not None:
+                    __export_feat = ogr.Feature(__export_layer_def)
+                    __export_feat.SetFrom(__tmp_feat)
+                    __export_layer.CreateFeature(__export_feat)
+
+            # Go to Next feature
+            __file_feat = __file_layer.GetNextFeature()
+
+        # Save profiles of fields with new type
+        for __index, __file_index, __field_t, __field_n, \
+                __field_p in __new_fields:
+            __profile_fields[__index] = __field_p.information()
+
+        # Save profiles of centroids
+        if __centroids:
+            for __i in range(0, 2):
+                __profile_fields[__centroids_index[__i]] = \
+                    __centroids_profile[__i].information()
+
+        # Close files
+        __export_layer = None
+        __export_src = None
+        __tmp_layer.SyncToDisk()
+        __tmp_layer = None
+        __tmp_src = None
+        __file_layer = None
+        __file_src = None
+
+        # Open new file to get its fields, original files
+        # are replaced later by swap_ogr_layer
+        __file_src = __file.Open(
+            __tmp_folder + __path['name'] + __path['extension'], 0
+        )
+        __file_layer = __file_src.GetLayer()
+        __file_layer_def = __file_layer.GetLayerDefn()
+
+    # Write web format file from original file
+    elif export is not None:
+
+        # Create web format file with same schema
+        __export_src, __export_layer = \
+            create_ogr_export(export, __file_layer)
+        __export_layer_def = __export_layer.GetLayerDefn()
+
+        # Iterate over features of the layer
+        __file_feat = __file_layer.GetNextFeature()
+        while __file_feat is not None:
+
+            # Write feature at web format file
+            __export_feat = ogr.Feature(__export_layer_def)
+            __export_feat.SetFrom(__file_feat)
+            __export_layer.CreateFeature(__export_feat)
+
+            # Go to Next feature
+            __file_feat = __file_layer.GetNextFeature()
+
+        # Close files
+        __export_layer = None
+        __export_src = None
+        __file_layer.ResetReading()
+
+    # Create structure for final fields
+    __fields_info = {'info': [], 'info_values': {}, 'info_extended': {}}
+
+    # Get information about final fields
+    for __index in range(0, __file_layer_def.GetFieldCount()):
+
+        # Get definition of the field
+        __file_field = __file_layer_def.GetFieldDefn(__index)
+        __field_n = __file_field.GetNameRef()
+
+        # Save field structure
+        __fields_info['info'].append(
+            get_ogr_field_message(__file_field)
+        )
+        __fields_info['info_values'][__field_n] = \
+            get_ogr_field_type(__file_field.GetTypeName())
+        __fields_info['info_extended'][__field_n] = \
+            __profile_fields[__index]
 
     # Close file
-    __file_layer.SyncToDisk()
     __fields_flags = None
+    __file_layer_def = None
+    __file_layer = None
     __file_src = None
 
-    return __rem_fields, len(__file_feat_rem)
+    return __rem_fields, __fields_info
 
 
 def get_projection(path):
@@ -571,16 +1242,7 @@ def get_projection(path):
     __file_layer = __file_src.GetLayer()
 
     # Get Spatial reference
-    __file_spatial = __file_layer.GetSpatialRef()
-
-    # Detect GIS kind of data
-    __f_cs = 'GEOGCS' if __file_spatial.IsGeographic() == 1 else 'PROJCS'
-    __f_an = __file_spatial.GetAuthorityName(__f_cs)
-    __f_ac = __file_spatial.GetAuthorityCode(__f_cs)
-
-    # Detect if name and code are valid
-    __file_spatial = str(__f_an) + ':' + str(__f_ac) \
-        if __f_an is not None and __f_ac is not None else None
+    __file_spatial = get_ogr_projection(__file_layer)
 
     # Close file
     __file_src = None
@@ -588,10 +1250,11 @@ def get_projection(path):
     return __file_spatial
 
 
-def set_centroids(path):
-    """ This function calculates the centroid
-        for geometries of specific Geo-spatial
-        file and save them on the same file.
+def index_ogr_layer(path):
+    """ This function generates the spatial index of
+        specific Geo-spatial file (.qix for Shapefiles), it
+        is used by GDAL when the layer is read with a
+        spatial filter.
 
     Args:
         path (string): file's path
@@ -604,84 +1267,328 @@ def set_centroids(path):
     # Get kind of file depending on final extension
     __driver = get_ogr_driver(__path['extension'])
 
-    # Get layer from OGR Tools to check if
-    # there is any field is null or empty, so
-    # must be deleted, this file is opened as
-    # DataSource Read-Write (1)
+    # Check if driver has spatial index files
+    if __driver != 'ESRI Shapefile':
+        return
+
+    # Get layer from OGR Tools, this file is
+    # opened as DataSource Read-Write (1)
     from osgeo import ogr
     __file = ogr.GetDriverByName(__driver)
     __file_src = __file.Open(path, 1)
     __file_layer = __file_src.GetLayer()
 
-    # Add field to layer
-    __file_field = ogr.FieldDefn('geometry_c', ogr.OFTString)
-    __file_layer.CreateField(__file_field)
+    # Generate spatial index of the layer
+    __file_src.ExecuteSQL(
+        'CREATE SPATIAL INDEX ON "' + __file_layer.GetName() + '"'
+    )
 
-    # Iterate over features of the layer
-    __file_feat = __file_layer.GetNextFeature()
-    while __file_feat is not None:
+    # Close file
+    __file_layer = None
+    __file_src = None
 
-        # Get Geometry
-        __file_geom = __file_feat.GetGeometryRef()
 
-        # Get Centroid value as WKT
-        __file_cent = __file_geom.Centroid().ExportToWkt()
+def swap_ogr_layer(path, info=None):
+    """ This function replaces the files of specific
+        Geo-spatial file by the validated ones of its temporary
+        folder. The information of the layer is written first
+        at a marker file, so a replacement interrupted is
+        completed by next execution instead of validating
+        the layer again, and the marker is moved the last.
 
-        # Save value at new field
-        __file_feat.SetField('geometry_c', __file_cent)
-        __file_layer.SetFeature(__file_feat)
-        
-        # Next feature
-        __file_feat = __file_layer.GetNextFeature()
+    Args:
+        path (string): file's path
+        info (dict): information about the outputs
 
-    # Close file
-    __file_layer.ResetReading()
-    __file_layer.SyncToDisk()
-    __file_src = None
+    Returns:
+        dict: information saved at the marker or None
+
+    """
+
+    # Get information from path
+    __path = utils.parse_path(path)
+    __tmp_folder = __path['folder'] + '.' + __path['name'] + os.sep
+    __marker = __path['name'] + ogr_validated_extension
+    __tmp_marker = __tmp_folder + __marker
+
+    # Check if files were replaced by previous execution
+    if not os.path.isdir(__tmp_folder):
+        if not os.path.isfile(__path['folder'] + __marker):
+            return None
+        with open(__path['folder'] + __marker, 'r') as __marker_file:
+            return json.load(__marker_file)['info']
+
+    # Write marker with information and new files
+    if info is not None and not os.path.isfile(__tmp_marker):
+        with open(__tmp_marker + '.tmp', 'w') as __marker_file:
+            json.dump({
+                'files': [
+                    __tmp_file for __tmp_file in os.listdir(__tmp_folder)
+                    if not __tmp_file.startswith(__marker)
+                ],
+                'info': info
+            }, __marker_file)
+        os.rename(__tmp_marker + '.tmp', __tmp_marker)
+
+    # Remove new files if validation was interrupted
+    if not os.path.isfile(__tmp_marker):
+        shutil.rmtree(__tmp_folder)
+        return None
+
+    # Get information from marker
+    with open(__tmp_marker, 'r') as __marker_file:
+        __marker_info = json.load(__marker_file)
+
+    # Remove original files that are not replaced,
+    # generated files are not valid for new ones
+    for __path_ext in get_ogr_file_extensions(__path['extension']) + \
+            ogr_index_extensions:
+        __path_delete = __path['name'] + __path_ext
+        if __path_delete not in __marker_info['files'] and \
+           os.path.isfile(__path['folder'] + __path_delete):
+            os.remove(__path['folder'] + __path_delete)
+
+    # Replace original files with new ones, files
+    # moved by previous execution are skipped
+    for __tmp_file in __marker_info['files']:
+        if os.path.isfile(__tmp_folder + __tmp_file):
+            os.rename(
+                __tmp_folder + __tmp_file,
+                __path['folder'] + __tmp_file
+            )
+
+    # Move marker next to the layer and remove folder
+    os.rename(__tmp_marker, __path['folder'] + __marker)
+    os.rmdir(__tmp_folder)
+
+    return __marker_info['info']
+
+
+def process_ogr_layer(path, export=None):
+    """ This function analyzes, validates and gets information
+        and fields from specific layer with only one reading
+        pass. It is independent for each layer, so it can
+        be executed at a pool of processes.
+
+    Args:
+        path (string): file's path
+        export (string): web format file's path
+
+    Returns:
+        dict: information about the outputs
+
+    """
+
+    # Complete replacement of files from previous execution
+    __info = swap_ogr_layer(path)
+    if __info is not None:
+        index_ogr_layer(path)
+        return __info
+
+    # Create profiler of the stages of the layer
+    __profiler = WorkerProfiler()
+
+    # Analyze layer capturing messages from GDAL
+    with __profiler.stage('analyze'):
+        __analysis, __errors = exec_library(analyze_ogr_layer, path)
+    __info = parse_ogr_return('', __errors)
+    __info['warn'] = []
+    __info['profile'] = __profiler.stages
+
+    # Check if any error exist
+    if len(__info['error']) or not __analysis:
+        __info['info_values'] = []
+        return __info
+
+    # Save information to structure
+    __info['info'] = [
+        'Geometry: ' + __analysis['geometry'],
+        'Feature Count: ' + str(__analysis['count']),
+        'Extent: ' + __analysis['bounding']
+    ]
+    __info['info_values'] = {
+        'geometry': __analysis['geometry'],
+        'features': __analysis['count'],
+        'bounding': __analysis['bounding']
+    }
+
+    # Add projection to info
+    if __analysis['crs'] is not None:
+        __info['info_values']['crs'] = __analysis['crs']
+        __info['info'].append('CRS: ' + __analysis['crs'])
+
+    # Check if layer is going to be removed
+    if __analysis['count'] == 0 or \
+       not check_geo_has_extent(__analysis['bounding']):
+        return __info
+
+    # Validate fields from analysis
+    with __profiler.stage('validate'):
+        __rem_fields, __info['fields'] = \
+            validate_ogr_fields(path, __analysis, export)
+
+    # Check if new fields is the same previous fields
+    if len(__rem_fields):
+
+        # Add new possible warning messages
+        __info['warn'] += [
+            'Removed field ' + __f +
+            ' because is empty'
+            for __f in __rem_fields
+        ]
+
+    # Check if some features have been removed
+    if len(__analysis['features_removed']):
+
+        # Add warning message
+        __info['warn'] += [
+            'Removed ' + str(len(__analysis['features_removed'])) +
+            ' features because they have not any geometry or '
+            'the geometry was not valid.'
+        ]
+
+    # Replace files by validated ones saving information first
+    swap_ogr_layer(path, __info)
 
+    # Generate spatial index of final layer
+    with __profiler.stage('index'):
+        index_ogr_layer(path)
 
-def set_vrt(path, layers, deleted):
-    """ This function generates the VRT file
-        to create a good conversion for GeoJSON
-        geo-spatial file.
+    return __info
+
+
+def process_ogr_layer_pool(arguments):
+    """ This function executes process_ogr_layer
+        from a pool of processes.
 
     Args:
-        path (dict): path's information
-        layers (list): list of file's path
-        deleted (list): list of index to be deleted
+        arguments (tuple): file's path and web format file's path
 
     Returns:
-        string: path of vrt path written to disk
+        dict: information about the outputs
 
     """
 
-    # Start template for VRT
-    __vrt_template = '<OGRVRTDataSource>' \
-        '<OGRVRTUnionLayer name="GeoLinkedData Features">'
+    return process_ogr_layer(*arguments)
+
+
+def create_ogr_export(path, layer):
+    """ This function creates the web format file
+        of a layer with the same schema.
+
+    Args:
+        path (string): web format file's path
+        layer (Layer): OGR layer with final schema
+
+    Returns:
+        tuple: datasource and layer of web format file
+
+    """
+
+    # Get driver of the web format
+    from osgeo import ogr
+    __export = str(config.gis_export)
+    __file = ogr.GetDriverByName(__export)
+
+    # Delete previous file
+    if os.path.exists(path):
+        __file.DeleteDataSource(path)
+
+    # Create file and layer
+    __export_src = __file.CreateDataSource(path)
+    __export_layer = __export_src.CreateLayer(
+        utils.parse_path(path)['name'], layer.GetSpatialRef(),
+        layer.GetGeomType(), ogr_export_options[__export]
+    )
+
+    # Copy fields of the layer
+    __layer_def = layer.GetLayerDefn()
+    for __index in range(0, __layer_def.GetFieldCount()):
+        __export_layer.CreateField(__layer_def.GetFieldDefn(__index))
+
+    return __export_src, __export_layer
 
-    # Iterate over files
-    for __file_i in range(0, len(layers)):
 
-        # Check if index needs to be included
-        if __file_i not in deleted:
-            __vrt_template += '<OGRVRTLayer name="' + \
-                layers[__file_i] + '">'
-            __vrt_template += '<SrcDataSource>' + \
-                path['folder'] + 'shp/' + \
-                layers[__file_i] + '.shp' + \
-                '</SrcDataSource>'
-            __vrt_template += '</OGRVRTLayer>'
+def merge_ogr_exports(paths, path):
+    """ This function merges the web format files of
+        the layers into only one layer of one file through
+        OGR, so the header (name and CRS) and the features
+        are written by the driver of the web format. The
+        schema is the union of the fields of the layers and
+        FlatGeobuf files get one spatial index for all.
 
-    # End template for VRT
-    __vrt_template += '</OGRVRTUnionLayer>' \
-        '</OGRVRTDataSource>'
+    Args:
+        paths (list): web format files' paths of layers
+        path (dict): path's information of final file
+
+    Returns:
+        string: path of merged file
+
+    """
+
+    # Generate path of final file
+    __export_path = path['folder'] + 'trs' + os.sep + path['name'] + \
+        ogr_export_extensions[config.gis_export]
 
-    # Write VRT file to disk
-    __vrt_path = path['folder'] + path['name'] + '.vrt'
-    with open(__vrt_path, 'w') as __vrt_file:
-        __vrt_file.write(__vrt_template)
+    # Check if files were merged by previous execution
+    if os.path.isfile(__export_path) and \
+       not all(os.path.isfile(__path) for __path in paths):
+        return __export_path
+
+    # Get driver of the web format
+    from osgeo import ogr
+    __export = str(config.gis_export)
+    __file = ogr.GetDriverByName(__export)
+
+    # Open files of the layers
+    __parts = [ogr.Open(__path, 0) for __path in paths]
+    __parts_layer = [__part.GetLayer() for __part in __parts]
+
+    # Create final file at temporal path, geometry types
+    # of the layers can be different
+    if os.path.exists(__export_path + '.tmp'):
+        __file.DeleteDataSource(__export_path + '.tmp')
+    __export_src = __file.CreateDataSource(__export_path + '.tmp')
+    __export_layer = __export_src.CreateLayer(
+        path['name'], __parts_layer[0].GetSpatialRef()
+        if len(__parts_layer) else None, ogr.wkbUnknown,
+        ogr_export_options[__export]
+    )
 
-    return __vrt_path
+    # Create fields of all the layers
+    __names = set()
+    for __part_layer in __parts_layer:
+        __part_layer_def = __part_layer.GetLayerDefn()
+        for __index in range(0, __part_layer_def.GetFieldCount()):
+            __part_field = __part_layer_def.GetFieldDefn(__index)
+            if __part_field.GetNameRef() not in __names:
+                __names.add(__part_field.GetNameRef())
+                __export_layer.CreateField(__part_field)
+    __export_layer_def = __export_layer.GetLayerDefn()
+
+    # Copy features of the layers
+    for __part_layer in __parts_layer:
+        __part_feat = __part_layer.GetNextFeature()
+        while __part_feat is not None:
+            __export_feat = ogr.Feature(__export_layer_def)
+            __export_feat.SetFrom(__part_feat)
+            __export_layer.CreateFeature(__export_feat)
+            __part_feat = __part_layer.GetNextFeature()
+
+    # Close files
+    __export_layer = None
+    __export_src = None
+    __parts_layer = None
+    __parts = None
+
+    # Replace final file
+    os.rename(__export_path + '.tmp', __export_path)
+
+    # Remove files of layers
+    for __path in paths:
+        os.remove(__path)
+
+    return __export_path
 
 
 def parse_ogr_return(outputs, errors):
@@ -849,6 +1756,70 @@ def parse_geo_return(outputs, errors):
 ##########################################################################
 
 
+# Capabilities of the process, they are detected once
+capabilities = None
+
+
+def get_capabilities(refresh=False):
+    """ This function returns the tools, GDAL version,
+        drivers and GeoKettle available for the process. They
+        are detected only the first time (or if refresh is set)
+        and shared by all the tasks of the process.
+
+    Args:
+        refresh (bool): flag to detect them again
+
+    Returns:
+        dict: capabilities of the process
+
+    """
+
+    global capabilities
+
+    # Check if capabilities are detected
+    if capabilities is not None and not refresh:
+        return capabilities
+
+    # Get paths of the command line tools
+    __capabilities = {
+        'tools': {
+            __tool: utils.find_env_path(__tool)
+            for __tool in ['ogr2ogr', 'ogrinfo', 'pan.sh', 'kitchen.sh']
+        },
+        'gdal': 0,
+        'drivers': [],
+        'geokettle': None,
+        'carte': False
+    }
+
+    # Get GDAL version and vector drivers
+    try:
+        from osgeo import gdal, ogr
+        __capabilities['gdal'] = int(gdal.VersionInfo('VERSION_NUM'))
+        __capabilities['drivers'] = [
+            ogr.GetDriver(__index).GetName()
+            for __index in range(0, ogr.GetDriverCount())
+        ]
+    except Exception:
+        pass
+
+    # Get location of GeoKettle, Carte server if it is
+    # configured or folder of the command line tools
+    if config.xml_engine == 'carte':
+        __capabilities['carte'] = carte.check_carte()
+        __capabilities['geokettle'] = config.xml_carte_url
+    elif __capabilities['tools']['pan.sh'] is not None:
+        __capabilities['geokettle'] = os.path.dirname(
+            __capabilities['tools']['pan.sh']
+        )
+
+    capabilities = __capabilities
+    return capabilities
+
+
+##########################################################################
+
+
 class WorkerGIS(object):
     """ This constructor creates only an instance of a
         GIS library for doing transformations or getting
@@ -860,39 +1831,55 @@ class WorkerGIS(object):
 
     """
 
-    def __init__(self):
-
-        # Set init values
-        self.gis_status = False
-        self.geo_status = False
-
-        # Set status of GIS configuration
-        if utils.check_env_path(['ogr2ogr', 'ogrinfo']):
-
-            # Check GDAL 2.2.0 version
-            try:
-                from osgeo import gdal
-                version_num = int(gdal.VersionInfo('VERSION_NUM'))
-                self.gis_status = version_num > 2020000
-            except Exception:
-                self.gis_status = False
-
-        self.geo_status = utils.check_env_path(['kitchen.sh', 'pan.sh'])
+    def __init__(self, refresh=False):
+
+        # Get capabilities of the process
+        self.capabilities = get_capabilities(refresh)
+        __tools = self.capabilities['tools']
+
+        # Set status of GIS configuration, the library
+        # engine does not need the command line tools,
+        # GDAL must be 2.2.0 version with web format driver
+        self.gis_status = (
+            config.gis_engine == 'library' or
+            (__tools['ogr2ogr'] is not None and
+             __tools['ogrinfo'] is not None)
+        ) and self.capabilities['gdal'] > 2020000 and \
+            config.gis_export in ogr_export_extensions and \
+            str(config.gis_export) in self.capabilities['drivers']
+
+        # Set status of GeoKettle configuration, the Carte
+        # engine does not need the command line tools
+        self.geo_status = self.capabilities['carte'] \
+            if config.xml_engine == 'carte' else \
+            __tools['pan.sh'] is not None and \
+            __tools['kitchen.sh'] is not None
         self.status = self.gis_status and self.geo_status
 
-    def transform(self, path, extension):
+    def transform(self, path, extension, profiler=None, checkpoint=None,
+                  progress=None):
         """ This function allows to transform any geo-spatial
             file to specific extension thanks to GDAL tools.
+            Finished stages (conversion, each layer and export)
+            are saved at the checkpoint, so other execution with
+            the same checkpoint skips them.
 
         Args:
             path (string): file's path
             extension (string): extension to be transformed
+            profiler (WorkerProfiler): profiler to measure stages
+            checkpoint (WorkerCheckpoint): finished stages
+            progress (WorkerProgress): progress of the stages
 
         Returns:
             dict: information about the outputs
 
         """
 
+        # Create profiler if it is not set
+        if profiler is None:
+            profiler = WorkerProfiler()
+
         # Get kind of file depending on final extension
         __driver = get_ogr_driver(extension)
 
@@ -905,67 +1892,96 @@ class WorkerGIS(object):
         __path_shp = __path['folder'] + 'shp' + os.sep
         __path_trs = __path['folder'] + 'trs' + os.sep
 
-        # Check if transformation paths exist
-        if os.path.exists(__path_shp) and \
-           os.path.exists(__path_trs):
-            return settings.generate_error_duplicated_transformation(), \
-                None, None, None, None
-
-        # Create arguments for transforming to Shapefile
-        __command = [__driver, __path_shp, path]
-
-        # Execute OGR
-        __g_info = cmd_ogr2ogr(__command)
+        # Get conversion from checkpoint of previous execution
+        __converted = checkpoint.get('convert') \
+            if checkpoint is not None else None
 
         # Generate header of messages
         __header = 'GDAL transformation - ' + \
             datetime.now().strftime('%Y-%m-%d %H:%M') + '\n'
 
-        # Get messages from transformation
-        __transform_error = len(__g_info['error'])
-        __transform_warn = len(__g_info['warn'])
-
-        # Check if there are some errors
-        if __transform_error:
-            __g_info['error'][-1] += '\n'
-            __g_info['error'] = [__header] + \
-                __g_info['error']
-            return __g_info, None, \
-                None, None, None
-
-        # Check if there are some warnings
-        if __transform_warn:
-            __g_info['warn'][-1] += '\n'
-            __g_info['warn'] = [__header] + \
-                __g_info['warn']
-
-        # Get all nodes from directory
-        __path_files = os.listdir(__path_shp)
-
-        # Rename and generate SHP structure
-        __layers_name = []
-        __layers_md5 = {}
-        for __path_rev in __path_files:
-
-            # Get information from file
-            __path_info = utils.parse_path(__path_rev)
-
-            # Check if md5 is saved
-            if __path_info['name'] not in __layers_md5:
-                __layers_md5[__path_info['name']] = \
-                    utils.md5_string(__path_rev)
-                __layers_name.append(
-                    __layers_md5[__path_info['name']]
-                )
-            __layer_md5 = __layers_md5[__path_info['name']]
+        # Check if conversion must be executed
+        if __converted is None:
 
-            # Execute rename
-            os.rename(
-                __path_shp + __path_rev,
-                __path_shp + __path_rev.replace(
-                    __path_info['name'], __layer_md5
+            # Check if transformation paths exist
+            if os.path.exists(__path_shp) and \
+               os.path.exists(__path_trs):
+                return settings.generate_error_duplicated_transformation(), \
+                    None, None, None, None
+
+            # Create arguments for transforming to Shapefile
+            __command = [__driver, __path_shp, path]
+
+            # Execute OGR
+            with profiler.stage('convert'):
+                __g_info = cmd_ogr2ogr(
+                    __command, None if progress is None else
+                    lambda __percent: progress.publish('convert', __percent)
                 )
-            )
+
+            # Get messages from transformation
+            __transform_error = len(__g_info['error'])
+            __transform_warn = len(__g_info['warn'])
+
+            # Check if there are some errors
+            if __transform_error:
+                __g_info['error'][-1] += '\n'
+                __g_info['error'] = [__header] + \
+                    __g_info['error']
+                return __g_info, None, \
+                    None, None, None
+
+            # Check if there are some warnings
+            if __transform_warn:
+                __g_info['warn'][-1] += '\n'
+                __g_info['warn'] = [__header] + \
+                    __g_info['warn']
+
+            # Get all nodes from directory
+            __path_files = os.listdir(__path_shp)
+
+            # Rename and generate SHP structure
+            __layers_name = []
+            __layers_md5 = {}
+            with profiler.stage('rename'):
+                for __path_rev in __path_files:
+
+                    # Get information from file
+                    __path_info = utils.parse_path(__path_rev)
+
+                    # Check if md5 is saved
+                    if __path_info['name'] not in __layers_md5:
+                        __layers_md5[__path_info['name']] = \
+                            utils.md5_string(__path_rev)
+                        __layers_name.append(
+                            __layers_md5[__path_info['name']]
+                        )
+                    __layer_md5 = __layers_md5[__path_info['name']]
+
+                    # Execute rename
+                    os.rename(
+                        __path_shp + __path_rev,
+                        __path_shp + __path_rev.replace(
+                            __path_info['name'], __layer_md5
+                        )
+                    )
+
+            # Save conversion at checkpoint
+            if checkpoint is not None:
+                checkpoint.save('convert', {
+                    'messages': __g_info,
+                    'names': __layers_name,
+                    'md5': __layers_md5
+                })
+
+        else:
+
+            # Get conversion from checkpoint
+            __g_info = __converted['messages']
+            __layers_name = __converted['names']
+            __layers_md5 = __converted['md5']
+            __transform_error = len(__g_info['error'])
+            __transform_warn = len(__g_info['warn'])
 
         # Convert keys to values
         __layers_md5 = {
@@ -982,14 +1998,111 @@ class WorkerGIS(object):
         # Structure for fields'
         __layers_fields_info = {'raw': [], 'info': []}
 
+        # Get completed paths
+        __paths_rev = [
+            __path_shp + __layer_name + extension
+            for __layer_name in __layers_name
+        ]
+
+        # Get web format paths if file is not a GeoJSON
+        if __driver != 'GeoJSON':
+
+            # Check folder of transformations
+            if not os.path.exists(__path_trs) or \
+               not os.path.isdir(__path_trs):
+                os.mkdir(__path_trs)
+
+            __paths_export = [
+                __path_trs + __layer_name +
+                ogr_export_extensions[config.gis_export]
+                for __layer_name in __layers_name
+            ]
+
+        else:
+            __paths_export = [None] * len(__layers_name)
+
+        # Get layers validated by previous execution
+        __layers_analysis = [
+            checkpoint.get('layer:' + __layer_name)
+            if checkpoint is not None else None
+            for __layer_name in __layers_name
+        ]
+        __layers_pending = [
+            __path_rev_i for __path_rev_i in range(0, len(__layers_name))
+            if __layers_analysis[__path_rev_i] is None
+        ]
+        __layers_arguments = [
+            (__paths_rev[__path_rev_i], __paths_export[__path_rev_i])
+            for __path_rev_i in __layers_pending
+        ]
+
+        # Analyze and validate layers with GDAL, layers are
+        # independent so a pool of processes can be used (billiard
+        # allows it at Celery workers, daemonic processes), results
+        # keep the same order of the layers
+        with profiler.stage('layers'):
+            __pool = None
+            if config.gis_workers > 1 and len(__layers_pending) > 1:
+                try:
+                    __pool = Pool(
+                        min(config.gis_workers, len(__layers_pending))
+                    )
+                except AssertionError:
+                    __pool = None
+            if __pool is not None:
+                __layers_results = __pool.imap(
+                    process_ogr_layer_pool, __layers_arguments, 1
+                )
+            else:
+                __layers_results = (
+                    process_ogr_layer_pool(__arguments)
+                    for __arguments in __layers_arguments
+                )
+            try:
+
+                # Save each layer at checkpoint when it is finished
+                for __n, __gi_info in enumerate(__layers_results):
+                    __path_rev_i = __layers_pending[__n]
+                    __layers_analysis[__path_rev_i] = __gi_info
+                    if checkpoint is not None:
+                        checkpoint.save(
+                            'layer:' + __layers_name[__path_rev_i],
+                            __gi_info
+                        )
+
+                    # Publish finished layers
+                    if progress is not None:
+                        progress.publish('layers', 100 * (
+                            len(__layers_name) - len(__layers_pending) +
+                            __n + 1
+                        ) / len(__layers_name))
+
+            finally:
+                if __pool is not None:
+                    __pool.close()
+                    __pool.join()
+
+        # Remove markers of validated layers, their
+        # information is saved at checkpoint
+        for __path_rev in __paths_rev:
+            __path_marker = __path_rev.replace(
+                extension, ogr_validated_extension
+            )
+            if os.path.isfile(__path_marker):
+                os.remove(__path_marker)
+
+        # Add stages of each layer to profiler
         for __path_rev_i in range(0, len(__layers_name)):
+            profiler.extend(
+                __layers_analysis[__path_rev_i].get('profile', []),
+                'layer ' + __layers_name[__path_rev_i] + ' - '
+            )
 
-            # Get completed path
-            __path_rev = __path_shp + \
-                __layers_name[__path_rev_i] + extension
+        for __path_rev_i in range(0, len(__layers_name)):
 
-            # Get information from GDAL
-            __gi_info = self.get_info(__path_rev)
+            # Get completed path and analysis
+            __path_rev = __paths_rev[__path_rev_i]
+            __gi_info = __layers_analysis[__path_rev_i]
 
             # Check if file has not features, bad
             # extend or any previous issue
@@ -1003,7 +2116,8 @@ class WorkerGIS(object):
                 __paths_index_delete.append(__path_rev_i)
 
                 # Delete all possible extensions
-                for __path_ext in get_ogr_file_extensions(extension):
+                for __path_ext in get_ogr_file_extensions(extension) + \
+                        ogr_index_extensions + [ogr_validated_extension]:
 
                     # Get real path to delete
                     __path_delete = __path_rev.replace(
@@ -1034,9 +2148,8 @@ class WorkerGIS(object):
                 # Next file
                 continue
 
-            # Validate and save messages
-            __raw_validate_info, __rem_features = \
-                self.validate_fields(__path_rev)
+            # Get messages from validation
+            __raw_validate_info = __gi_info['warn']
 
             # Check if there are some warnings
             if len(__raw_validate_info):
@@ -1058,17 +2171,6 @@ class WorkerGIS(object):
                     ] + '\n')
                 __g_info['warn'] += __raw_validate_info
 
-            # # Get updated information from GDAL if
-            # some features have been removed
-            if __rem_features > 0:
-                __gi_info = self.get_info(__path_rev)
-
-            # Generate centroid if is a Polygon
-            if __gi_info['info_values']['geometry'] == 'Polygon':
-
-                # Execute centroids generation
-                set_centroids(__path_rev)
-
             # Save layers' information
             __raw_layer_info = __gi_info['info']
             if __path_rev_i < len(__layers_name) - 1:
@@ -1082,11 +2184,11 @@ class WorkerGIS(object):
             __layers_info['info'].append(__gi_info['info_values'])
 
             # Get information about new information fields
-            __raw_fields_info = self.get_fields(__path_rev, False, True)
+            __raw_fields_info = __gi_info['fields']
             if len(__raw_fields_info['info']):
                 __layers_fields_info['info'].append({
                     'values': __raw_fields_info['info_values'],
-                    'dup': __raw_fields_info['info_extended']
+                    'profile': __raw_fields_info['info_extended']
                 })
                 __raw_fields_info = __raw_fields_info['info']
                 if __path_rev_i < len(__layers_name) - 1:
@@ -1115,20 +2217,20 @@ class WorkerGIS(object):
         # Check if file is not a GeoJSON
         elif __driver != 'GeoJSON':
 
-            # Generate VRT for GeoJSON transformation
-            __vrt_path = set_vrt(
-                __path, __layers_name,
-                __paths_index_delete
-            )
-
-            # Check folder of transformations
-            if not os.path.exists(__path_trs) or \
-               not os.path.isdir(__path_trs):
-                os.mkdir(__path_trs)
-
-            # Execute transformation to GeoJSON
-            __geo_path = __path_trs + __path['name'] + '.geojson'
-            cmd_ogr2ogr(['GeoJSON', __geo_path, __vrt_path])
+            # Merge web format files of valid layers
+            if checkpoint is None or checkpoint.get('export') is None:
+                if progress is not None:
+                    progress.publish('export', 0)
+                with profiler.stage('export'):
+                    merge_ogr_exports([
+                        __paths_export[__path_rev_i]
+                        for __path_rev_i in range(0, len(__layers_name))
+                        if __path_rev_i not in __paths_index_delete
+                    ], __path)
+
+                # Save export at checkpoint
+                if checkpoint is not None:
+                    checkpoint.save('export', 1)
 
         # Delete bad layers
         __layers_name = [
@@ -1213,64 +2315,13 @@ class WorkerGIS(object):
 
         return __info
 
-    def validate_fields(self, path):
-        """ This function allows to validate fields from
-            specific file thanks to GDAL tools.
-
-        Args:
-            path (string): file's path
-
-        Returns:
-            tuple: information about the outputs and
-                how many features have been eliminated
-
-        """
-
-        # Get information when executes
-        __info = self.get_fields(path)
-
-        # Check if any error exist
-        if len(__info['error']):
-            return []
-
-        # Validate fields from received information
-        __rem_fields, __rem_features = validate_ogr_fields(
-            path, __info['info_values'].keys()
-        )
-
-        # Set empty return structure
-        __log_messages = []
-
-        # Check if new fields is the same previous fields
-        if len(__rem_fields):
-
-            # Add new possible warning messages
-            __log_messages += [
-                'Removed field ' + __f +
-                ' because is empty'
-                for __f in __rem_fields
-            ]
-
-        # Check if some features have been removed
-        if __rem_features > 0:
-
-            # Add warning message
-            __log_messages += [
-                'Removed ' + str(__rem_features) + ' features '
-                'because they have not any geometry or the '
-                'geometry was not valid.'
-            ]
-
-        return __log_messages, __rem_features
-
-    def get_fields(self, path, inc_layers=False, extend=False):
+    def get_fields(self, path, inc_layers=False):
         """ This function allows to get fields' information
             from specific file thanks to GDAL tools.
 
         Args:
             path (string): file's path
             inc_layers (bool): flag to include layers' name
-            extend (bool): flag to include extended info
 
         Returns:
             dict: information about the outputs
@@ -1316,24 +2367,11 @@ class WorkerGIS(object):
                 __field_type = __field_type[
                     :__field_type.index('(') - 1
                 ]
-                __field_type = str(__field_type).lower()
-
-                # Check field info
-                if __field_type == 'real':
-                    __field_type = 'float'
-                elif __field_type == 'integer64':
-                    __field_type = 'long'
+                __field_type = get_ogr_field_type(__field_type)
 
                 # Save field structure
                 __values[__field_name] = __field_type
 
-            # Check if extended information
-            if extend:
-
-                # Get extra information
-                __info['info_extended'] = \
-                    extend_ogr_fields(path, __values)
-
             # Save structure
             __info['info_values'] = __values
 
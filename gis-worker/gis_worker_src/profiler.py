@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import os
+import sys
+import time
+import resource
+from contextlib import contextmanager
+
+if sys.version_info < (3, 0):
+    reload(sys)
+    sys.setdefaultencoding('utf8')
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+def get_rss():
+    """ This function returns the resident memory
+        of the current process.
+
+    Returns:
+        int: resident memory (KB)
+
+    """
+
+    try:
+        with open('/proc/self/statm') as __statm:
+            return int(__statm.read().split()[1]) * \
+                resource.getpagesize() / 1024
+    except (IOError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def get_rss_peak():
+    """ This function returns the peak of resident memory
+        of the current process since the last reset.
+
+    Returns:
+        int: peak of resident memory (KB)
+
+    """
+
+    try:
+        with open('/proc/self/status') as __status:
+            for __line in __status:
+                if __line.startswith('VmHWM:'):
+                    return int(__line.split()[1])
+    except (IOError, IndexError, ValueError):
+        pass
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def reset_rss_peak():
+    """ This function resets the peak of resident memory
+        of the current process (Linux 4.0 or greater), otherwise
+        the peak is the one of the whole process.
+
+    """
+
+    try:
+        with open('/proc/self/clear_refs', 'w') as __clear_refs:
+            __clear_refs.write('5')
+    except (IOError, OSError):
+        pass
+
+
+##########################################################################
+
+
+class WorkerProfiler(object):
+    """ This constructor creates a profiler that saves the
+        wall time, the resident memory at the end and the peak
+        of resident memory of each stage. Stages can be nested,
+        the peak of a stage includes the peaks of its children.
+
+    Returns:
+        class: Worker Profiler
+
+    """
+
+    def __init__(self):
+
+        # Set init values
+        self.stages = []
+        self.peaks = []
+
+    @contextmanager
+    def stage(self, name):
+        """ This function allows to measure a stage
+            with the with statement.
+
+        Args:
+            name (string): stage's name
+
+        """
+
+        # Save peak of parent stage before resetting it
+        if len(self.peaks):
+            self.peaks[-1] = max(self.peaks[-1], get_rss_peak())
+
+        # Start measures
+        reset_rss_peak()
+        self.peaks.append(0)
+        __start = time.time()
+
+        try:
+            yield
+        finally:
+
+            # Get peak of stage and its children
+            __peak = max(self.peaks.pop(), get_rss_peak())
+            if len(self.peaks):
+                self.peaks[-1] = max(self.peaks[-1], __peak)
+
+            # Save measures of stage
+            self.stages.append({
+                'stage': name,
+                'wall': round(time.time() - __start, 4),
+                'rss': get_rss(),
+                'rss_peak': __peak
+            })
+
+    def extend(self, stages, prefix):
+        """ This function allows to add the stages
+            measured by other profiler (other process).
+
+        Args:
+            stages (list): stages of the other profiler
+            prefix (string): prefix of the stages' names
+
+        """
+
+        for __stage in stages:
+            __stage = dict(__stage)
+            __stage['stage'] = prefix + __stage['stage']
+            self.stages.append(__stage)
+
+    def messages(self):
+        """ This function allows to get the measures
+            as messages to be printed.
+
+        Returns:
+            list: messages of the stages
+
+        """
+
+        return [
+            '%s: %.4f s - RSS %d KB (peak %d KB)' % (
+                __stage['stage'], __stage['wall'],
+                __stage['rss'], __stage['rss_peak']
+            ) for __stage in self.stages
+        ]
@@ -370,6 +370,11 @@ class Config(object):
         self.upload_mime = settings['upload']['types']
         self.upload_drivers = settings['upload']['drivers']
 
+        # ROUTING CONFIGURATION
+        # uploads with more features or MB go to large queue
+        self.routing_features = settings['routing']['features']
+        self.routing_size = settings['routing']['size']
+
         # CELERY CONFIGURATION
         self.celery_port = settings['celery']['port']
         self.celery_host = settings['celery']['url'] if self.celery_port == 80 or \
@@ -378,10 +383,45 @@ class Config(object):
         self.celery_user = settings['celery']['username']
         self.celery_pwd = settings['celery']['password']
 
+        # GIS CONFIGURATION
+        # engine = process (ogr2ogr / ogrinfo) or library (osgeo)
+        self.gis_engine = settings['gis']['engine']
+        # processes to analyze layers (1 = serial execution)
+        self.gis_workers = settings['gis']['workers']
+        # web format = GeoJSON, GeoJSONSeq or FlatGeobuf
+        self.gis_export = settings['gis']['export']
+        # distinct values saved per field before using a sketch
+        self.gis_profile_cap = settings['gis']['profile_cap']
+        self.gis_profile_precision = settings['gis']['profile_precision']
+        # values classified together to infer kind of fields
+        self.gis_inference_chunk = settings['gis']['inference_chunk']
+        # memory (MB) for profiles of fields of a layer (0 = unbounded)
+        self.gis_memory = settings['gis']['memory']
+        # seconds before stopping a process (0 = unlimited)
+        self.gis_timeout = settings['gis']['timeout']
+        # memory (MB) of GDAL processes (0 = unlimited)
+        self.gis_process_memory = settings['gis']['process_memory']
+        # processes executed at the same time by host (0 = unlimited)
+        self.gis_slots = settings['gis']['slots']
+        # folder of the slots shared by the workers (empty = temporal)
+        self.gis_slots_folder = settings['gis']['slots_folder']
+        # point of polygons = centroid or surface (point on surface)
+        self.gis_centroid = settings['gis']['centroid']
+        # folder to save finished transformations (empty = disabled)
+        self.gis_cache_folder = settings['gis']['cache']
+        # size (MB) and days without use of the cache (0 = unlimited)
+        self.gis_cache_size = settings['gis']['cache_size']
+        self.gis_cache_age = settings['gis']['cache_age']
+
         # XML CONFIGURATION
         self.xml_allowed_steps = settings['xml']['steps']
         self.xml_allowed_entries = settings['xml']['entries']
         self.xml_allowed_paths = settings['xml']['folders']
+        # engine = process (pan.sh / kitchen.sh) or carte (running JVM)
+        self.xml_engine = settings['xml']['engine']
+        self.xml_carte_url = settings['xml']['carte']['url']
+        self.xml_carte_user = settings['xml']['carte']['user']
+        self.xml_carte_password = settings['xml']['carte']['password']
         self.xml_special_paths = [
             '${Internal.Transformation.Filename.Directory}',
             '${Internal.Job.Filename.Directory}'
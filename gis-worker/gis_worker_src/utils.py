@@ -72,6 +72,31 @@ def check_env_path(executables):
     return False
 
 
+def find_env_path(executable):
+    """ This function returns the path of an executable
+        included on the current environment (PATH variable).
+
+    Args:
+        executable (string): executable's name
+
+    Returns:
+        string: executable's path or None
+
+    """
+
+    # Create split character depending on operative system
+    path_split = ';' if 'win32' in sys.platform else ':'
+
+    # Check executable at each folder of PATH variable
+    for path_dir in os.environ.get('PATH', '').split(path_split):
+        path_file = os.path.join(path_dir, executable)
+        if os.path.isfile(path_file):
+            return path_file
+
+    # Executable was not found
+    return None
+
+
 def parse_path(path):
     """ This function allows you to parse a path.
 
@@ -18,11 +18,15 @@ import sys
 import shutil
 from os.path import splitext
 from celery.task import task
+from celery.signals import worker_process_init
+from gis_worker_src import cache
 from gis_worker_src import settings
 from celery.utils.log import get_task_logger
-from gis_worker_src.gis import WorkerGIS
+from gis_worker_src.gis import WorkerGIS, get_capabilities
 from gis_worker_src.xml import WorkerXML
-from gis_worker_src.database import WorkerRedis
+from gis_worker_src.database import WorkerRedis, WorkerCheckpoint, \
+    WorkerProgress, WorkerLock
+from gis_worker_src.profiler import WorkerProfiler
 
 if sys.version_info < (3, 0):
     reload(sys)
@@ -41,6 +45,9 @@ __email__ = "alejfcarrera@mail.ru"
 
 config = settings.Config()
 
+# GIS Worker shared by the tasks of the process
+gdal_instance = None
+
 
 ##########################################################################
 
@@ -73,8 +80,13 @@ def get_gdal_instance():
 
     """
 
-    # Create instance of GDAL methods
-    __gdal_lib = WorkerGIS()
+    global gdal_instance
+
+    # Create instance of GDAL methods once per process, the
+    # capabilities are detected again while they are not good
+    if gdal_instance is None or not gdal_instance.status:
+        gdal_instance = WorkerGIS(gdal_instance is not None)
+    __gdal_lib = gdal_instance
 
     # Check if libraries are good imported
     if not __gdal_lib.status:
@@ -88,6 +100,17 @@ def get_gdal_instance():
     return __gdal_lib
 
 
+@worker_process_init.connect
+def init_capabilities(**kwargs):
+    """ This function detects the capabilities of the
+        process when a Celery worker process starts, so
+        tasks do not detect them again.
+
+    """
+
+    get_capabilities(True)
+
+
 def get_libraries():
     """ This function allows to configure the database and the GDAL
         libraries to use them from the Celery workers of this project.
@@ -103,7 +126,8 @@ def get_libraries():
 ##########################################################################
 
 
-def transform_with_path(path, extension, logger):
+def transform_with_path(path, extension, logger, profiler=None,
+                        checkpoint=None, progress=None):
     """ This function transforms a gis or geometries path to
         other kind of geometry through GDAL libraries.
 
@@ -111,6 +135,9 @@ def transform_with_path(path, extension, logger):
         path (string): file's path
         extension (string): extension of transformation
         logger (Logger): logger class to write messages
+        profiler (WorkerProfiler): profiler to measure stages
+        checkpoint (WorkerCheckpoint): finished stages
+        progress (WorkerProgress): progress of the stages
 
     Return:
         dict: information about the outputs and status code
@@ -119,7 +146,9 @@ def transform_with_path(path, extension, logger):
 
     # Transform resource and return result
     __t_info, __ln_info, __lmd5_info, __li_info, __fn_info = \
-        get_gdal_instance().transform(path, extension)
+        get_gdal_instance().transform(
+            path, extension, profiler, checkpoint, progress
+        )
 
     # Detect if logger is not Celery logger
     if isinstance(logger, settings.WorkerLogger):
@@ -157,7 +186,8 @@ def transform_with_path(path, extension, logger):
     }
 
 
-def transform_with_id(identifier, information, logger):
+def transform_with_id(identifier, information, logger, profiler=None,
+                      checkpoint=None, progress=None):
     """ This function transforms a gis or geometries path to
         other kind of geometry through GDAL libraries.
 
@@ -165,6 +195,9 @@ def transform_with_id(identifier, information, logger):
         identifier (string): task internal id
         information (dict): information about task
         logger (Logger): logger class to write messages
+        profiler (WorkerProfiler): profiler to measure stages
+        checkpoint (WorkerCheckpoint): finished stages
+        progress (WorkerProgress): progress of the stages
 
     Return:
         dict: information about the outputs and status code
@@ -176,8 +209,30 @@ def transform_with_id(identifier, information, logger):
         identifier + os.sep + information['filename'] + \
         information['extension']
 
+    # Check if transformation is already saved at cache,
+    # a resumed transformation has its own files
+    __key = None
+    if config.gis_cache_folder and \
+       (checkpoint is None or not len(checkpoint.stages)):
+        __key = cache.get_cache_key(__path)
+        __information = cache.load_cache(
+            __key, os.path.dirname(__path)
+        )
+        if __information is not None:
+            return __information
+
     # Transform resource and get result
-    return transform_with_path(__path, '.shp', logger)
+    __information = transform_with_path(
+        __path, '.shp', logger, profiler, checkpoint, progress
+    )
+
+    # Save transformation at cache
+    if __key is not None and __information['status'] == 0:
+        cache.save_cache(
+            __key, os.path.dirname(__path), __information
+        )
+
+    return __information
 
 
 def transform_revert_with_id(identifier):
@@ -494,100 +549,131 @@ def init_mapping(identifier, logger):
 
     """
 
-    # Remove previous files
-    transform_revert_with_id(identifier)
+    # Create profiler of the stages of the task
+    __profiler = WorkerProfiler()
 
     # Get instance of Redis Database
     __redis = get_redis_instance()
 
     # Lock the execution for this task. In this case we will use
-    # the Redis SETNX to ensure that other remote machines won't do
-    # the same task.
-    __lock_status = __redis.lock(identifier, 'mapping-i')
+    # a lease lock (SET NX PX) extended while the task is running
+    # to ensure that other remote machines won't do the same task.
+    __lock = WorkerLock(__redis, identifier, 'mapping-i')
+    __lock_status = __lock.acquire()
 
     # Check status of the lock
     if __lock_status == 0:
 
-        # Get information about identifier
-        __file_info = __redis.get_information(identifier)
+        try:
 
-        # Check information
-        if __file_info is None:
+            # Get stages finished by a previous execution
+            # of this task (worker died or task was retried)
+            __checkpoint = WorkerCheckpoint(__redis, identifier, 'mapping-i')
 
-            # Show not found message
-            settings.dump_messages(
-                logger, settings.generate_error_identifier_not_found()
-            )
-
-        else:
+            # Create progress of the stages of the task
+            __progress = WorkerProgress(__redis, identifier, 'mapping-i')
 
-            # Transform to Shapefile
-            __o_info = transform_with_id(
-                identifier, __file_info, logger
-            )
+            # Remove previous files if task is not resumed
+            if not len(__checkpoint.stages):
+                with __profiler.stage('revert'):
+                    transform_revert_with_id(identifier)
 
-            # Delete previous records
-            __redis.remove_records(
-                identifier, 'mapping-i',
-                __o_info['status'] == 1
-            )
+            # Get information about identifier
+            __file_info = __redis.get_information(identifier)
 
-            if __o_info['status'] == 1:
+            # Check information
+            if __file_info is None:
 
                 # Show not found message
                 settings.dump_messages(
                     logger, settings.generate_error_identifier_not_found()
                 )
 
-            elif __o_info['status'] == 2:
+            else:
 
-                # Save error messages
-                if len(__o_info['messages']['error']):
-                    __redis.save_record_log(
-                        identifier, 'error',
-                        __o_info['messages']['error']
+                # Transform to Shapefile
+                with __profiler.stage('transform'):
+                    __o_info = transform_with_id(
+                        identifier, __file_info, logger,
+                        __profiler, __checkpoint, __progress
                     )
 
-                # Save status for tracking
-                __redis.save_record_status(
-                    identifier, 'mapping-i', 1
+                # Delete previous records, stages are kept
+                # until the results of the task are saved
+                __redis.remove_records(
+                    identifier, 'mapping-i',
+                    __o_info['status'] == 1, [__checkpoint.key]
                 )
 
-                # Remove generated files
-                transform_revert_with_id(identifier)
+                if __o_info['status'] == 1:
 
-            else:
+                    # Remove stages, task is finished
+                    __checkpoint.remove()
+
+                    # Show not found message
+                    settings.dump_messages(
+                        logger, settings.generate_error_identifier_not_found()
+                    )
 
-                # Save messages on database
-                for __k in settings.kind_logs:
-                    if len(__o_info['messages'][__k]):
-                        __redis.save_record_log(
-                            identifier, __k,
-                            __o_info['messages'][__k]
+                elif __o_info['status'] == 2:
+
+                    # Save error messages and status for
+                    # tracking as one batch of writes
+                    with __redis.batch():
+                        if len(__o_info['messages']['error']):
+                            __redis.save_record_log(
+                                identifier, 'error',
+                                __o_info['messages']['error']
+                            )
+                        __redis.save_record_status(
+                            identifier, 'mapping-i', 1
+                        )
+                        __checkpoint.remove()
+
+                    # Remove generated files
+                    transform_revert_with_id(identifier)
+
+                else:
+
+                    # Save results as one batch of writes per
+                    # database, its latency is the save stage
+                    with __profiler.stage('save'), __redis.batch():
+
+                        # Save messages on database
+                        for __k in settings.kind_logs:
+                            if len(__o_info['messages'][__k]):
+                                __redis.save_record_log(
+                                    identifier, __k,
+                                    __o_info['messages'][__k]
+                                )
+
+                        # Save information and fields from layers
+                        __redis.save_record_metadata(
+                            identifier,
+                            __o_info['information']['names'],
+                            __o_info['information']['names_md5'],
+                            __o_info['information']['properties'],
+                            __o_info['information']['fields']
                         )
 
-                # Save information from layers
-                __redis.save_record_info(
-                    identifier,
-                    __o_info['information']['names'],
-                    __o_info['information']['names_md5'],
-                    __o_info['information']['properties']
-                )
+                        # Save status for tracking success
+                        __redis.save_record_status(
+                            identifier, 'mapping-i', 0
+                        )
 
-                # Save fields from layers
-                __redis.save_record_fields(
-                    identifier,
-                    __o_info['information']['names'],
-                    __o_info['information']['fields']
-                )
+                        # Remove stages with the results
+                        __checkpoint.remove()
 
-                # Save status for tracking success
-                __redis.save_record_status(
-                    identifier, 'mapping-i', 0
-                )
+                # Save measures of the stages
+                __redis.save_record_profile(identifier, __profiler.stages)
+
+                # Publish end of the task
+                __progress.publish('finished', 100)
+
+        finally:
 
-        # Release lock
-        __redis.unlock(identifier + ':mapping-i', True)
+            # Release lock
+            __lock.release()
 
     else:
 
@@ -603,6 +689,91 @@ def init_mapping(identifier, logger):
         )
 
 
+def migrate_metadata(logger):
+    """ This function migrates the layers and fields of the
+        tasks saved with the previous keys to one document
+        per task.
+
+    Args:
+        logger (Logger): logger class to write messages
+
+    Returns:
+        dict: status code
+
+    """
+
+    # Migrate tasks
+    __migrated = get_redis_instance().migrate_records_metadata()
+
+    # Log messages
+    settings.dump_messages(logger, {
+        'info': [str(__migrated) + ' tasks were migrated'],
+        'warn': [],
+        'error': []
+    })
+
+    return {'status': 0}
+
+
+def get_task_route(identifier):
+    """ This function allows to classify a task by the
+        estimated number of features of its upload (index of
+        Shapefiles has 100 bytes of header and 8 bytes per
+        feature) or by the size of the other geo-spatial files,
+        so large uploads do not block the small ones at the
+        same queue.
+
+    Args:
+        identifier (string): task internal id
+
+    Returns:
+        dict: queue and routing key of the task
+
+    """
+
+    # Generate path from configuration
+    __path = config.upload_folder + os.sep + identifier
+
+    __features = 0
+    __size = 0
+
+    # Iterate over files of the upload
+    for __root, __dirs, __files in os.walk(__path):
+
+        # Skip folders generated by the transformation
+        if __root == __path:
+            __dirs[:] = [
+                __d for __d in __dirs if __d not in cache.cache_folders
+            ]
+
+        for __f in __files:
+            __f_ext = splitext(__f)[1].lower()
+            __f_path = os.path.join(__root, __f)
+
+            # Estimate features from indexes of Shapefiles
+            if __f_ext == '.shx':
+                __features += max(os.path.getsize(__f_path) - 100, 0) / 8
+
+            # Add size of other geo-spatial files
+            elif __f_ext != '.shp' and (
+                    __f_ext in config.upload_mime or
+                    __f_ext in config.upload_drivers):
+                __size += os.path.getsize(__f_path)
+
+    # Check thresholds of large uploads
+    if __features > config.routing_features or \
+       __size > config.routing_size * 1048576:
+        return {
+            'queue': 'geo-mapping-create-large',
+            'routing_key': 'geo.mapping.create.large'
+        }
+
+    return {
+        'queue': 'geo-mapping-create',
+        'routing_key': 'geo.mapping.create'
+    }
+
+
 ##########################################################################
 
 
@@ -620,6 +791,17 @@ def create_mapping(self, identifier):
     # Create logger to log messages to specific log file
     __logger = get_task_logger(__name__)
 
+    # Send large uploads to their own queue, producers send
+    # every initial mapping to geo-mapping-create
+    __route = get_task_route(identifier)
+    __delivery = self.request.delivery_info or {}
+    if __delivery.get('routing_key') == 'geo.mapping.create' and \
+       __route['queue'] == 'geo-mapping-create-large':
+        self.apply_async(
+            args=[identifier], exchange='geo.mapping', **__route
+        )
+        return
+
     try:
 
         # Execute new initial mapping generation
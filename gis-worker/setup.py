@@ -44,8 +44,8 @@ setup(
     url="https://github.com/oeg-upm/website-geo.git",
     packages=find_packages(exclude=['ez_setup', 'examples', 'tests']),
     install_requires=[
-        'celery', 'hiredis', 'redis',
-        'defusedxml', 'python-dateutil'
+        'celery', 'billiard', 'hiredis', 'redis',
+        'defusedxml'
     ],
     classifiers=[],
     scripts=['gis_worker.py']
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from gis_worker_src import cache
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.settings = (
+            cache.config.gis_cache_folder, cache.config.gis_cache_size,
+            cache.config.gis_cache_age, cache.config.gis_engine
+        )
+        cache.config.gis_cache_folder = os.path.join(self.path, 'cache')
+        os.mkdir(cache.config.gis_cache_folder)
+
+    def tearDown(self):
+        cache.config.gis_cache_folder, cache.config.gis_cache_size, \
+            cache.config.gis_cache_age, cache.config.gis_engine = \
+            self.settings
+        shutil.rmtree(self.path)
+
+    def create_file(self, name, content):
+        __path = os.path.join(self.path, name)
+        with open(__path, 'w') as __file:
+            __file.write(content)
+        return __path
+
+    def create_entry(self, key, size, used):
+        __path = os.path.join(cache.config.gis_cache_folder, key)
+        os.makedirs(os.path.join(__path, 'shp'))
+        with open(os.path.join(__path, 'shp', 'layer.shp'), 'w') as __file:
+            __file.write('x' * size)
+        __info = os.path.join(__path, cache.cache_information)
+        with open(__info, 'w') as __file:
+            json.dump({}, __file)
+        os.utime(__info, (used, used))
+
+    def test_key(self):
+        __path = self.create_file('a.zip', 'content')
+        __key = cache.get_cache_key(__path)
+        self.assertEqual(__key, cache.get_cache_key(__path))
+        self.assertNotEqual(
+            __key, cache.get_cache_key(self.create_file('b.zip', 'content'))
+        )
+        self.create_file('a.zip', 'other content')
+        self.assertNotEqual(__key, cache.get_cache_key(__path))
+
+    def test_key_engine(self):
+        __path = self.create_file('a.zip', 'content')
+        cache.config.gis_engine = 'process'
+        __key = cache.get_cache_key(__path)
+        cache.config.gis_engine = 'library'
+        self.assertNotEqual(__key, cache.get_cache_key(__path))
+
+    def test_evict_size(self):
+        __now = time.time()
+        cache.config.gis_cache_age = 0
+        cache.config.gis_cache_size = 1
+        self.create_entry('old', 600 * 1024, __now - 20)
+        self.create_entry('middle', 300 * 1024, __now - 10)
+        self.create_entry('new', 300 * 1024, __now)
+        cache.evict_cache()
+        self.assertEqual(
+            sorted(os.listdir(cache.config.gis_cache_folder)),
+            ['middle', 'new']
+        )
+
+    def test_evict_age(self):
+        __now = time.time()
+        cache.config.gis_cache_age = 1
+        cache.config.gis_cache_size = 0
+        self.create_entry('old', 10, __now - 2 * 86400)
+        self.create_entry('new', 10, __now)
+        self.create_entry('new.1234', 10, __now - 2 * 86400)
+        cache.evict_cache()
+        self.assertEqual(
+            sorted(os.listdir(cache.config.gis_cache_folder)),
+            ['new', 'new.1234']
+        )
+
+    def test_evict_disabled(self):
+        cache.config.gis_cache_age = 0
+        cache.config.gis_cache_size = 0
+        self.create_entry('old', 10, 0)
+        cache.evict_cache()
+        self.assertEqual(os.listdir(cache.config.gis_cache_folder), ['old'])
+
+    def test_load(self):
+        __task = os.path.join(self.path, 'task')
+        os.mkdir(__task)
+        self.assertIsNone(cache.load_cache('key', __task))
+        cache.save_cache('key', __task, {'messages': {
+            'warn': ['GDAL transformation - 2017-01-02 10:11\n', 'x'],
+            'error': []
+        }})
+        __info = cache.load_cache('key', __task)
+        self.assertNotIn('2017-01-02', __info['messages']['warn'][0])
+        self.assertTrue(
+            __info['messages']['warn'][0].startswith('GDAL transformation')
+        )
+        self.assertEqual(__info['messages']['warn'][1], 'x')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import unittest
+from gis_worker_src import carte
+from gis_worker_src.gis import parse_geo_return
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+class TestCarteLog(unittest.TestCase):
+
+    log = '2017/05/10 10:20:30 - Pan - Start of run.\r\n' \
+        '2017/05/10 10:20:31 - Step - ERROR - broken\n' \
+        'plain line'
+
+    def test_format(self):
+        self.assertEqual(carte.format_carte_log(self.log).split('\n'), [
+            'INFO  10-05 10:20:30,000 - Pan - Start of run.',
+            'ERROR 10-05 10:20:31,000 - Step - ERROR - broken',
+            'plain line'
+        ])
+
+    def test_parse(self):
+        self.assertEqual(
+            parse_geo_return(carte.format_carte_log(self.log), ''), {
+                'info': ['Pan - Start of run.'], 'warn': [],
+                'error': ['Step - ERROR - broken']
+            }
+        )
+
+    def test_empty(self):
+        self.assertEqual(carte.format_carte_log(''), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
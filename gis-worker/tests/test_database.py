@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import unittest
+from gis_worker_src import database
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+class TestMetadata(unittest.TestCase):
+
+    metadata = {
+        'layers': {'a1b2': {'name': u'Área', 'features': 3}},
+        'fields': {'a1b2': [['NAME', 4, 'NAME'], ['ID', 0, 'ID']]}
+    }
+
+    def setUp(self):
+        self.compress = database.config.redis_worker['compress']
+
+    def tearDown(self):
+        database.config.redis_worker['compress'] = self.compress
+
+    def test_compressed(self):
+        database.config.redis_worker['compress'] = True
+        __encoded = database.encode_metadata(self.metadata)
+        self.assertFalse(__encoded.startswith('{'))
+        self.assertEqual(database.decode_metadata(__encoded), self.metadata)
+
+    def test_not_compressed(self):
+        database.config.redis_worker['compress'] = False
+        __encoded = database.encode_metadata(self.metadata)
+        self.assertTrue(__encoded.startswith('{'))
+        self.assertEqual(database.decode_metadata(__encoded), self.metadata)
+
+    def test_changed_configuration(self):
+        database.config.redis_worker['compress'] = False
+        __encoded = database.encode_metadata(self.metadata)
+        database.config.redis_worker['compress'] = True
+        self.assertEqual(database.decode_metadata(__encoded), self.metadata)
+
+
+if __name__ == '__main__':
+    unittest.main()
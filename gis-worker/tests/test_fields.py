@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import unittest
+from gis_worker_src import fields
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+class TestConvertValue(unittest.TestCase):
+
+    def test_numbers(self):
+        self.assertEqual(fields.convert_value('-12', 0), -12)
+        self.assertEqual(fields.convert_value('12345678901', 12), 12345678901)
+        self.assertEqual(fields.convert_value('1.5e3', 2), 1500.0)
+        self.assertIsNone(fields.convert_value('1.5', 0))
+
+    def test_dates(self):
+        self.assertEqual(fields.convert_value('2017-3-4', 9), '2017-03-04')
+        self.assertEqual(fields.convert_value('2017/03/04', 9), '2017-03-04')
+        self.assertEqual(
+            fields.convert_value('2017-03-04T10:20:30Z', 9), '2017-03-04'
+        )
+
+    def test_ambiguous_dates(self):
+        self.assertEqual(fields.convert_value('03/04/2017', 9), '2017-03-04')
+        self.assertEqual(fields.convert_value('13/04/2017', 9), '2017-04-13')
+
+    def test_invalid_dates(self):
+        self.assertIsNone(fields.convert_value('2017-02-30', 9))
+        self.assertIsNone(fields.convert_value('13/13/2017', 9))
+        self.assertIsNone(fields.convert_value('value', 9))
+
+    def test_strings(self):
+        self.assertEqual(fields.convert_value('value', 4), 'value')
+
+
+class TestFieldKind(unittest.TestCase):
+
+    def infer(self, values, kind=4, chunk=2):
+        __kind = fields.FieldKind(kind, chunk)
+        for __value in values:
+            __kind.add(__value)
+        return __kind.result()
+
+    def test_numbers(self):
+        self.assertEqual(self.infer(['1', '-2', '3']), 0)
+        self.assertEqual(self.infer(['1', '12345678901']), 12)
+        self.assertEqual(self.infer(['1', '2', '3.5']), 2)
+        self.assertEqual(self.infer(['1', '12345678901', '.5']), 2)
+
+    def test_leading_zeros(self):
+        self.assertEqual(self.infer(['1', '007']), 4)
+
+    def test_dates(self):
+        self.assertEqual(self.infer(['2017-01-02', '03/04/2017']), 9)
+        self.assertEqual(self.infer(['2017-01-02', '2017-02-30']), 4)
+
+    def test_mixed(self):
+        self.assertEqual(self.infer(['1', '2', '2017-01-02']), 4)
+        self.assertEqual(self.infer(['2017-01-02', '2017-01-03', '1']), 4)
+        self.assertEqual(self.infer(['1', 'value']), 4)
+
+    def test_new_lines(self):
+        self.assertEqual(self.infer(['1\n2']), 4)
+
+    def test_no_values(self):
+        self.assertEqual(self.infer([]), 4)
+
+    def test_not_inferred(self):
+        self.assertEqual(self.infer(['1', '2'], kind=2), 2)
+        self.assertEqual(self.infer(['1', '2'], kind=12), 0)
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_empty(self):
+        self.assertEqual(fields.HyperLogLog(10).cardinality(), 0)
+
+    def test_repeated_values(self):
+        __sketch = fields.HyperLogLog(10)
+        for __n in range(0, 1000):
+            __sketch.add('value')
+        self.assertEqual(__sketch.cardinality(), 1)
+
+    def test_error(self):
+        __sketch = fields.HyperLogLog(12)
+        for __n in range(0, 50000):
+            __sketch.add(__n)
+        self.assertLessEqual(
+            abs(__sketch.cardinality() - 50000),
+            50000 * 3 * __sketch.error
+        )
+
+
+class TestFieldProfile(unittest.TestCase):
+
+    def test_exact(self):
+        __profile = fields.FieldProfile(cap=10, precision=10)
+        for __value in ['a', 'b', None, 'c', None]:
+            __profile.add(__value)
+        self.assertEqual(__profile.information(), {
+            'cardinality': 3, 'estimated': 0, 'unique': 1, 'nulls': 0.4
+        })
+
+    def test_duplicated(self):
+        __profile = fields.FieldProfile(cap=10, precision=10)
+        for __value in ['a', 'b', 'a']:
+            __profile.add(__value)
+        __info = __profile.information()
+        self.assertEqual(__info['cardinality'], 2)
+        self.assertEqual(__info['unique'], 0)
+
+    def test_only_nulls(self):
+        __profile = fields.FieldProfile(cap=10, precision=10)
+        self.assertEqual(__profile.information()['nulls'], 0.0)
+        __profile.add(None)
+        self.assertEqual(__profile.information(), {
+            'cardinality': 0, 'estimated': 0, 'unique': 1, 'nulls': 1.0
+        })
+
+    def test_estimated(self):
+        __profile = fields.FieldProfile(cap=100, precision=12)
+        for __n in range(0, 20000):
+            __profile.add(__n)
+        __info = __profile.information()
+        self.assertIsNone(__profile.values)
+        self.assertEqual(__info['estimated'], 1)
+        self.assertEqual(__info['unique'], 1)
+        self.assertLessEqual(__info['cardinality'], 20000)
+        self.assertGreaterEqual(
+            __info['cardinality'],
+            20000 * (1 - 3 * __profile.sketch.error)
+        )
+
+    def test_estimated_duplicated(self):
+        __profile = fields.FieldProfile(cap=100, precision=12)
+        for __n in range(0, 20000):
+            __profile.add(__n % 5000)
+        __info = __profile.information()
+        self.assertEqual(__info['estimated'], 1)
+        self.assertEqual(__info['unique'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Ontology Engineering Group
+        http://www.oeg-upm.net/
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Copyright (C) 2017 Ontology Engineering Group.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+  Geographic Information System Worker is licensed under a
+  Creative Commons Attribution-NC 4.0 International License.
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=#
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import gis_worker_tasks
+
+__author__ = "Alejandro F. Carrera"
+__copyright__ = "Copyright 2017 © GeoLinkeddata Platform"
+__credits__ = ["Alejandro F. Carrera", "Oscar Corcho"]
+__license__ = "Creative Commons Attribution-Noncommercial license"
+__maintainer__ = "Alejandro F. Carrera"
+__email__ = "alejfcarrera@mail.ru"
+
+
+##########################################################################
+
+
+config = gis_worker_tasks.config
+
+
+class TestTaskRoute(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.settings = (
+            config.upload_folder, config.routing_features,
+            config.routing_size
+        )
+        config.upload_folder = self.path
+        config.routing_features = 10
+        config.routing_size = 1
+        os.makedirs(os.path.join(self.path, 'task', 'folder'))
+
+    def tearDown(self):
+        config.upload_folder, config.routing_features, \
+            config.routing_size = self.settings
+        shutil.rmtree(self.path)
+
+    def create_file(self, name, size):
+        with open(os.path.join(self.path, 'task', name), 'w') as __file:
+            __file.truncate(size)
+
+    def get_queue(self):
+        return gis_worker_tasks.get_task_route('task')['queue']
+
+    def test_empty(self):
+        self.assertEqual(self.get_queue(), 'geo-mapping-create')
+
+    def test_shapefile_features(self):
+        self.create_file(os.path.join('folder', 'a.shx'), 100 + 8 * 10)
+        self.create_file(os.path.join('folder', 'a.shp'), 2 * 1048576)
+        self.create_file(os.path.join('folder', 'a.dbf'), 2 * 1048576)
+        self.assertEqual(self.get_queue(), 'geo-mapping-create')
+        self.create_file('b.shx', 100 + 8)
+        self.assertEqual(self.get_queue(), 'geo-mapping-create-large')
+
+    def test_other_size(self):
+        self.create_file('a.geojson', 1048576)
+        self.assertEqual(self.get_queue(), 'geo-mapping-create')
+        self.create_file(os.path.join('folder', 'b.KML'), 1)
+        self.assertEqual(self.get_queue(), 'geo-mapping-create-large')
+
+    def test_transformation_folders(self):
+        for __folder in gis_worker_tasks.cache.cache_folders:
+            os.mkdir(os.path.join(self.path, 'task', __folder))
+            self.create_file(os.path.join(__folder, 'a.shx'), 100 + 8 * 20)
+            self.create_file(os.path.join(__folder, 'a.json'), 1048577)
+        self.assertEqual(self.get_queue(), 'geo-mapping-create')
+
+
+if __name__ == '__main__':
+    unittest.main()
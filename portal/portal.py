@@ -135,6 +135,10 @@ class Portal(object):
                 'geo-mapping-create', mapping_exchange,
                 routing_key='geo.mapping.create'
             ),
+            Queue(
+                'geo-mapping-create-large', mapping_exchange,
+                routing_key='geo.mapping.create.large'
+            ),
             Queue(
                 'geo-mapping-extend', mapping_exchange,
                 routing_key='geo.mapping.extend'
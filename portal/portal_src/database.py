@@ -183,14 +183,16 @@ def configure_redis(configuration):
 #    tasks list of Users
 __redis = configure_redis(config.redis)
 
-# Execute method to create new instance of Redis - Worker
+# Execute method to create new instance of Redis - Worker, the
+# databases are the same of the GIS Worker (same order)
 # 0) tasks - Control about lock / unlock tasks
 # 1) status - Status about finished tasks
-# 2) files - Information about files from tasks
-# 3) mapping-i - Initial mapping
-# 4) mapping-i-m - Initial mapping messages
-# 5) mapping-e - Extended mapping
-# 6) mapping-e-m - Extended mapping messages
+# 2) messages - Messages with information (backtrace)
+# 3) files - Information about files from tasks
+# 4) mapping-i - Initial mapping
+# 5) mapping-v - Validation mapping
+# 6) mapping-s - Semantic mapping
+# 7) mapping-e - Extended mapping
 __redis_worker = configure_redis(config.redis_worker)
 
 # Execute method to create new instance of Redis - Cache
@@ -654,8 +656,10 @@ def set_account_task(identifier, task_identifier, file_info):
         identifier, 'upload', __time
     )
 
-    # Save information on worker database
-    __redis_worker['files'].hmset(
+    # Save information on worker database with
+    # the registry of the keys of the task
+    __pipe = __redis_worker['files'].pipeline(transaction=True)
+    __pipe.hmset(
         task_identifier, {
             'phase': 1,
             'uploaded_at': __date,
@@ -665,6 +669,47 @@ def set_account_task(identifier, task_identifier, file_info):
             'extension': file_info['extension']
         }
     )
+    __pipe.sadd(task_identifier + ':keys', task_identifier)
+    __pipe.execute()
+
+
+def remove_task_records(identifier):
+    """ This function allows to delete the keys of a task
+        from the worker databases. Only the keys saved at the
+        registry of the task (identifier:keys) are deleted,
+        keys of tasks uploaded before the registry are searched
+        by the identifier.
+
+    Args:
+        identifier (string): task internal id
+
+    """
+
+    # Tasks uploaded before the registry of keys
+    # have not registry at files database
+    __legacy = not __redis_worker['files'].exists(identifier + ':keys')
+
+    __databases = [
+        'tasks', 'status', 'messages', 'mapping-i',
+        'mapping-v', 'mapping-s', 'mapping-e'
+    ]
+    for __d in __databases:
+        __registry = identifier + ':keys'
+
+        # Search keys without registry (locks are not removed)
+        if not __redis_worker[__d].exists(__registry):
+            if __legacy and __d != 'tasks':
+                for __k in __redis_worker[__d].scan_iter(identifier + '*'):
+                    __redis_worker[__d].delete(__k)
+            continue
+
+        # Delete keys and then registry
+        __keys = list(__redis_worker[__d].smembers(__registry))
+        __pipe = __redis_worker[__d].pipeline(transaction=True)
+        if len(__keys):
+            __pipe.delete(*__keys)
+        __pipe.delete(__registry)
+        __pipe.execute()
 
 
 def get_account_tasks(identifier):
@@ -703,13 +748,7 @@ def get_account_tasks(identifier):
             __redis['tasks'].srem(identifier, __task)
 
             # Remove any other trace
-            __databases = [
-                'status', 'mapping-i', 'mapping-i-m',
-                'mapping-e', 'mapping-e-m'
-            ]
-            for __d in __databases:
-                for __k in __redis_worker[__d].scan_iter(__task + '*'):
-                    __redis_worker[__d].delete(__k)
+            remove_task_records(__task)
 
             # Jump to other task
             continue
@@ -765,13 +804,7 @@ def get_account_tasks_pend(identifier):
             __redis['tasks'].srem(identifier, __task)
 
             # Remove any other trace
-            __databases = [
-                'status', 'mapping-i', 'mapping-i-m',
-                'mapping-e', 'mapping-e-m'
-            ]
-            for __d in __databases:
-                for __k in __redis_worker[__d].scan_iter(__task + '*'):
-                    __redis_worker[__d].delete(__k)
+            remove_task_records(__task)
 
             # Jump to other task
             continue
@@ -793,12 +826,21 @@ def get_account_tasks_pend(identifier):
         __status = 0 if __status == 'upload' else 2 if \
             __status == 'mapping-i:0' else 1
 
+        # Get progress published by the worker
+        __progress = __redis_worker['tasks'].hgetall(
+            __task + ':mapping-i:progress'
+        )
+
         # Append information
         __tasks_info.append({
             'id': __task,
             'name': __task[0:6] + '... ' + __task[-6:],
             'date': __task_info['modified_at'],
-            'status': __status
+            'status': __status,
+            'progress': {
+                'stage': __progress['stage'],
+                'percent': int(__progress['percent'])
+            } if len(__progress) else None
         })
 
     return __tasks_info
@@ -224,6 +224,70 @@ def generate_sha_path(path):
     return __sha
 
 
+def get_task_route(path):
+    """ This function allows to classify a task by the
+        estimated number of features of its upload (index of
+        Shapefiles has 100 bytes of header and 8 bytes per
+        feature) or by the size of the other geo-spatial files,
+        so large uploads do not block the small ones at the
+        same queue.
+
+    Args:
+        path (string): task's folder
+
+    Returns:
+        dict: queue and routing key of the task
+
+    """
+
+    __features = 0
+    __size = 0
+
+    # Iterate over files of the task
+    for __root, __dirs, __files in os.walk(path):
+        for __f in __files:
+            __f_ext = splitext(__f)[1].lower()
+            __f_path = os.path.join(__root, __f)
+
+            # Estimate features from indexes of Shapefiles
+            if __f_ext == '.shx':
+                __features += max(os.path.getsize(__f_path) - 100, 0) / 8
+
+            # Add size of other geo-spatial files (compressed
+            # uploads are counted by their extracted files)
+            elif __f_ext in config.upload_mime and __f_ext != '.zip':
+                __size += os.path.getsize(__f_path)
+
+    # Check thresholds of large uploads
+    if __features > config.routing_features or \
+       __size > config.routing_size * 1048576:
+        return {
+            'queue': 'geo-mapping-create-large',
+            'routing_key': 'geo.mapping.create.large'
+        }
+
+    return {
+        'queue': 'geo-mapping-create',
+        'routing_key': 'geo.mapping.create'
+    }
+
+
+def send_task_mapping(identifier, path):
+    """ This function allows to send the initial mapping
+        of a task to the queue of its size.
+
+    Args:
+        identifier (string): internal task id
+        path (string): task's folder
+
+    """
+
+    config.CELERY_APP.send_task(
+        'gis_worker_tasks.create_mapping', args=[identifier],
+        exchange='geo.mapping', **get_task_route(path)
+    )
+
+
 def remove_task_path(identifier):
     """ This function allows you to remove a
         task from upload folder
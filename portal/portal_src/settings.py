@@ -181,6 +181,9 @@ class Singleton(object):
             ':' + str(self.celery_port)
         self.celery_user = settings['celery']['username']
         self.celery_pwd = settings['celery']['password']
+        # uploads with more features go to large queue
+        self.routing_features = settings['routing']['features']
+        self.routing_size = settings['routing']['size']
 
         # DATABASE CONFIGURATION
         self.redis = settings['redis']